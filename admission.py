@@ -0,0 +1,133 @@
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Tuple
+
+
+class AdmissionRejected(Exception):
+    """请求被限流或因过载被拒绝，retry_after 为建议的重试等待秒数"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    按客户端的令牌桶限流
+
+    每个客户端一个桶，按 rate_per_minute 匀速补充，最多存 burst 个令牌。
+    一次请求按工作量消耗多个令牌（例如交易条数），超过 burst 的按 burst 计，
+    保证大批量导入在桶满时仍能被接受。
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_clients: int = 10000):
+        """
+        :param rate_per_minute: 每分钟补充的令牌数，<=0 表示不限流
+        :param burst: 桶容量
+        :param max_clients: 最多保留的桶数量，超过时淘汰最久未使用的桶
+        """
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self.max_clients = max(1, max_clients)
+        # 按最近使用顺序排列，末尾为最近使用
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str, cost: int = 1):
+        """
+        消耗令牌，不足时抛出 AdmissionRejected
+
+        :param key: 客户端标识
+        :param cost: 本次请求的工作量
+        """
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        cost = min(max(1, cost), self.burst)
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < cost:
+            self._store(key, tokens, now)
+            retry_after = math.ceil((cost - tokens) / self.rate)
+            raise AdmissionRejected("请求过于频繁，请稍后再试", retry_after)
+        self._store(key, tokens - cost, now)
+
+    def _store(self, key: str, tokens: float, now: float):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+
+class AdmissionGate:
+    """
+    全局并发闸门：限制同时进行的LLM或Firefly工作数量
+
+    超过 limit 的请求排队等待，排队数达到 max_queue 时直接拒绝（快速返回429）。
+    大批量请求只能占用 bulk_limit 个名额，为交互式的小请求保留余量。
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, bulk_limit: int = None):
+        """
+        :param name: 闸门名称，用于提示信息
+        :param limit: 最大并发数，<=0 表示不限制
+        :param max_queue: 最大排队数
+        :param bulk_limit: 大批量请求最多占用的并发数，默认 limit 的一半
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.bulk_limit = bulk_limit if bulk_limit is not None else max(1, limit // 2)
+        self.in_flight = 0
+        self.waiting = 0
+        self._avg_seconds = 1.0
+        self._semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+        self._bulk_semaphore = asyncio.Semaphore(self.bulk_limit) if limit > 0 else None
+
+    def _retry_after(self) -> int:
+        """根据平均处理耗时估算排队清空所需时间"""
+        return max(1, math.ceil(self._avg_seconds * (self.waiting + 1) / max(1, self.limit)))
+
+    @asynccontextmanager
+    async def slot(self, bulk: bool = False):
+        """
+        占用一个并发名额
+
+        :param bulk: 是否为大批量请求
+        :raises: AdmissionRejected 排队已满时抛出
+        """
+        if self._semaphore is None:
+            yield
+            return
+        # 大批量请求先在 bulk 信号量上排队，按调用方实际会阻塞的信号量判断是否需要排队
+        semaphore = self._bulk_semaphore if bulk else self._semaphore
+        if self.waiting >= self.max_queue and semaphore.locked():
+            raise AdmissionRejected(f"{self.name}繁忙，请稍后再试", self._retry_after())
+        self.waiting += 1
+        acquired_bulk = False
+        try:
+            if bulk:
+                await self._bulk_semaphore.acquire()
+                acquired_bulk = True
+            await self._semaphore.acquire()
+        except BaseException:
+            if acquired_bulk:
+                self._bulk_semaphore.release()
+            raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - start)
+            self._semaphore.release()
+            if acquired_bulk:
+                self._bulk_semaphore.release()
+
+    def stats(self) -> Dict:
+        return {"in_flight": self.in_flight, "waiting": self.waiting, "limit": self.limit}
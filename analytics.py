@@ -0,0 +1,320 @@
+import sys
+import time
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+from firefly_api import FireflyIIIAPIClient
+
+
+def _sampled_size(container, sample: int = 64, count_keys: bool = True) -> int:
+    """
+    估算按行增长的容器占用的字节数
+
+    逐项计算在行数很大时太慢，这里用前 sample 项的平均大小乘以总项数；
+    字典按键和值计（键与其他字典共享时用 count_keys=False 跳过），列表元素为列表时连同其中的元素一起计。
+    """
+    size = sys.getsizeof(container)
+    count = len(container)
+    if count == 0:
+        return size
+    if isinstance(container, dict):
+        items = container.items() if count_keys else ((value,) for value in container.values())
+    else:
+        items = ((item,) for item in container)
+    sampled = 0
+    taken = 0
+    for item in items:
+        for obj in item:
+            sampled += sys.getsizeof(obj)
+            if isinstance(obj, list):
+                sampled += sum(sys.getsizeof(element) for element in obj)
+        taken += 1
+        if taken >= sample:
+            break
+    return size + sampled * count // taken
+
+
+class TransactionSnapshot:
+    """
+    交易记录的列式内存快照
+
+    从Firefly III分页拉取交易，按拆分(journal)存成NumPy列：金额、日期、分类/账户/类型编码，
+    标签按 (行号, 标签编码) 展开存储。汇总查询直接在内存数组上完成，不再逐次请求Firefly。
+    刷新是增量的：按日期倒序拉取，遇到一整页都没有新增或变更的记录即停止。
+    补记的历史交易不在最新的几页里，mark_stale 会记下最早的交易日期，下次刷新时按 start 重新拉取该日期之后的全部记录；
+    超过 full_refresh_interval 后做一次全量重建以同步删除和在其他地方做的历史修改。
+    """
+
+    GROUP_FIELDS = ("category", "tag", "source_account", "destination_account", "type")
+    BUCKETS = ("day", "week", "month", "year")
+
+    def __init__(self, firefly: FireflyIIIAPIClient, page_size=200,
+                 refresh_interval=60, full_refresh_interval=6 * 3600):
+        """
+        :param firefly: Firefly III API 客户端
+        :param page_size: 每页拉取的交易数量
+        :param refresh_interval: 增量刷新的最小间隔（秒）
+        :param full_refresh_interval: 全量重建的间隔（秒）
+        """
+        self.firefly = firefly
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.full_refresh_interval = full_refresh_interval
+        self._lock = threading.Lock()
+        self.last_refresh = 0.0
+        self.last_full_refresh = 0.0
+        # mark_stale 记录的最早交易日期（YYYY-MM-DD），下次刷新从该日期起重新拉取
+        self._stale_since = None
+        self._reset()
+
+    def _reset(self):
+        self.amounts = np.empty(0, dtype=np.float64)
+        self.dates = np.empty(0, dtype="datetime64[D]")
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.source_codes = np.empty(0, dtype=np.int32)
+        self.destination_codes = np.empty(0, dtype=np.int32)
+        self.type_codes = np.empty(0, dtype=np.int32)
+        self.tag_rows = np.empty(0, dtype=np.int64)
+        self.tag_codes = np.empty(0, dtype=np.int32)
+        # 编码字典：名称 -> 编码，以及反查列表
+        self._dicts = {field: ({}, []) for field in self.GROUP_FIELDS}
+        self._row_of = {}       # journal_id -> 行号
+        self._updated_at = {}   # journal_id -> updated_at
+        self._row_tags = []     # 每行的标签编码列表
+
+    def _encode(self, field: str, name) -> int:
+        if name is None or name == "":
+            return -1
+        codes, names = self._dicts[field]
+        code = codes.get(name)
+        if code is None:
+            code = len(names)
+            codes[name] = code
+            names.append(name)
+        return code
+
+    def _decode(self, field: str, code: int) -> str:
+        if code < 0:
+            return "未分类" if field == "category" else "无"
+        return self._dicts[field][1][code]
+
+    def _fetch_rows(self, full: bool, start: Optional[str] = None) -> List[Dict]:
+        """
+        分页拉取交易，增量模式下遇到全部未变化的一页即停止
+
+        :param full: 是否拉取全部记录
+        :param start: 只拉取该日期之后的记录，此时拉完整个范围，不提前停止
+        """
+        rows = []
+        page = 1
+        while True:
+            response = self.firefly.get_transactions_page(page=page, limit=self.page_size, start=start)
+            changed = False
+            for group in response.get("data", []):
+                updated_at = group["attributes"].get("updated_at")
+                for split in group["attributes"].get("transactions", []):
+                    journal_id = str(split.get("transaction_journal_id"))
+                    if not full and self._updated_at.get(journal_id) == updated_at:
+                        continue
+                    changed = True
+                    rows.append({
+                        "journal_id": journal_id,
+                        "updated_at": updated_at,
+                        "amount": float(split.get("amount") or 0),
+                        "date": (split.get("date") or "")[:10],
+                        "category": split.get("category_name"),
+                        "source_account": split.get("source_name"),
+                        "destination_account": split.get("destination_name"),
+                        "type": split.get("type"),
+                        "tags": split.get("tags") or [],
+                    })
+            pagination = response.get("meta", {}).get("pagination", {})
+            total_pages = pagination.get("total_pages", page)
+            if page >= total_pages or (not full and not start and not changed):
+                break
+            page += 1
+        return rows
+
+    def _apply(self, rows: List[Dict]):
+        """把拉取到的记录写入列存：已存在的行原地更新，新记录追加"""
+        new_rows = [r for r in rows if r["journal_id"] not in self._row_of]
+        start = len(self.amounts)
+        if new_rows:
+            extra = len(new_rows)
+            self.amounts = np.concatenate([self.amounts, np.zeros(extra, dtype=np.float64)])
+            self.dates = np.concatenate([self.dates, np.zeros(extra, dtype="datetime64[D]")])
+            for name in ("category_codes", "source_codes", "destination_codes", "type_codes"):
+                setattr(self, name, np.concatenate([getattr(self, name), np.full(extra, -1, dtype=np.int32)]))
+            for offset, row in enumerate(new_rows):
+                self._row_of[row["journal_id"]] = start + offset
+                self._row_tags.append([])
+
+        for row in rows:
+            index = self._row_of[row["journal_id"]]
+            self._updated_at[row["journal_id"]] = row["updated_at"]
+            self.amounts[index] = row["amount"]
+            self.dates[index] = np.datetime64(row["date"], "D") if row["date"] else np.datetime64("NaT")
+            self.category_codes[index] = self._encode("category", row["category"])
+            self.source_codes[index] = self._encode("source_account", row["source_account"])
+            self.destination_codes[index] = self._encode("destination_account", row["destination_account"])
+            self.type_codes[index] = self._encode("type", row["type"])
+            self._row_tags[index] = [self._encode("tag", tag) for tag in row["tags"]]
+
+        if rows:
+            counts = np.fromiter((len(tags) for tags in self._row_tags), dtype=np.int64, count=len(self._row_tags))
+            self.tag_rows = np.repeat(np.arange(len(self._row_tags), dtype=np.int64), counts)
+            self.tag_codes = np.fromiter(
+                (code for tags in self._row_tags for code in tags), dtype=np.int32, count=int(counts.sum())
+            )
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        刷新快照
+
+        :param full: 是否强制全量重建
+        :return: 本次写入的记录数
+        """
+        with self._lock:
+            now = time.time()
+            full = full or now - self.last_full_refresh > self.full_refresh_interval
+            since, self._stale_since = self._stale_since, None
+            try:
+                rows = self._fetch_rows(full)
+                if since and not full:
+                    # 同一记录可能在两次拉取中都出现，按 journal_id 去重
+                    merged = {row["journal_id"]: row for row in self._fetch_rows(False, start=since)}
+                    merged.update((row["journal_id"], row) for row in rows)
+                    rows = list(merged.values())
+            except Exception:
+                if since:
+                    self.mark_stale(since)
+                raise
+            if full:
+                self._reset()
+                self.last_full_refresh = now
+            self._apply(rows)
+            self.last_refresh = now
+            return len(rows)
+
+    def ensure_fresh(self):
+        """距离上次刷新超过 refresh_interval 时做一次增量刷新"""
+        if time.time() - self.last_refresh > self.refresh_interval:
+            self.refresh()
+
+    def clear(self):
+        """释放快照数据，下次查询时全量重建"""
+        with self._lock:
+            self._reset()
+            self.last_refresh = 0.0
+            self.last_full_refresh = 0.0
+
+    def nbytes(self) -> int:
+        """估算快照占用的字节数：列数组，加上按行维护的Python索引和编码字典"""
+        arrays = (self.amounts, self.dates, self.category_codes, self.source_codes,
+                  self.destination_codes, self.type_codes, self.tag_rows, self.tag_codes)
+        size = sum(array.nbytes for array in arrays)
+        # _updated_at 与 _row_of 共用 journal_id 字符串作为键
+        size += _sampled_size(self._row_of) + _sampled_size(self._updated_at, count_keys=False)
+        size += _sampled_size(self._row_tags)
+        for codes, names in self._dicts.values():
+            size += _sampled_size(codes) + _sampled_size(names)
+        return size
+
+    def mark_stale(self, since: Optional[str] = None):
+        """
+        有新交易写入时调用，下次查询会立即刷新
+
+        :param since: 写入交易中最早的日期（YYYY-MM-DD 开头即可），下次刷新会从该日期起重新拉取，
+                      使补记的历史交易也能进入快照
+        """
+        if since:
+            since = since[:10]
+            if self._stale_since is None or since < self._stale_since:
+                self._stale_since = since
+        self.last_refresh = 0.0
+
+    @staticmethod
+    def _bucket(dates: np.ndarray, bucket: str) -> np.ndarray:
+        if bucket == "day":
+            return dates
+        if bucket == "week":
+            # 以周一为一周开始：1970-01-01 是周四
+            days = dates.astype(np.int64)
+            return (days - (days + 3) % 7).astype("datetime64[D]")
+        if bucket == "month":
+            return dates.astype("datetime64[M]")
+        return dates.astype("datetime64[Y]")
+
+    def summary(self, group_by: Optional[str] = None, bucket: Optional[str] = None,
+                start: Optional[str] = None, end: Optional[str] = None,
+                transaction_type: Optional[str] = "withdrawal") -> List[Dict]:
+        """
+        按分类/标签/账户/类型及时间粒度汇总金额
+
+        :param group_by: 分组字段，可选 category/tag/source_account/destination_account/type，为空则不分组
+        :param bucket: 时间粒度，可选 day/week/month/year，为空则不按时间分桶
+        :param start: 起始日期（含，格式：YYYY-MM-DD）
+        :param end: 结束日期（含，格式：YYYY-MM-DD）
+        :param transaction_type: 交易类型过滤，默认只统计支出(withdrawal)；可选 deposit/transfer，
+            传 all 或空值时不过滤（各类型金额均为正数，直接相加没有收支意义）
+        :return: 汇总列表，每项包含 bucket、key、total、count，按 bucket 和 total 倒序排列
+        :raises: ValueError 当分组字段或时间粒度不合法时抛出
+        """
+        if group_by is not None and group_by not in self.GROUP_FIELDS:
+            raise ValueError(f"不支持的分组字段 '{group_by}'，可选项: {list(self.GROUP_FIELDS)}")
+        if bucket is not None and bucket not in self.BUCKETS:
+            raise ValueError(f"不支持的时间粒度 '{bucket}'，可选项: {list(self.BUCKETS)}")
+
+        with self._lock:
+            mask = ~np.isnat(self.dates)
+            if start:
+                mask &= self.dates >= np.datetime64(start, "D")
+            if end:
+                mask &= self.dates <= np.datetime64(end, "D")
+            if transaction_type and transaction_type != "all":
+                code = self._dicts["type"][0].get(transaction_type)
+                mask &= self.type_codes == (code if code is not None else -2)
+
+            if group_by == "tag":
+                rows = self.tag_rows[mask[self.tag_rows]]
+                keys = self.tag_codes[mask[self.tag_rows]]
+            else:
+                rows = np.flatnonzero(mask)
+                columns = {
+                    "category": self.category_codes,
+                    "source_account": self.source_codes,
+                    "destination_account": self.destination_codes,
+                    "type": self.type_codes,
+                }
+                keys = columns[group_by][rows] if group_by else np.zeros(len(rows), dtype=np.int32)
+            amounts = self.amounts[rows]
+
+            if bucket:
+                buckets = self._bucket(self.dates[rows], bucket)
+                bucket_values = buckets.astype(np.int64)
+            else:
+                buckets = None
+                bucket_values = np.zeros(len(rows), dtype=np.int64)
+
+            if len(rows) == 0:
+                return []
+            pairs = np.stack([bucket_values, keys.astype(np.int64)], axis=1)
+            unique_pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            totals = np.bincount(inverse, weights=amounts, minlength=len(unique_pairs))
+            counts = np.bincount(inverse, minlength=len(unique_pairs))
+
+            order = np.lexsort((-totals, -unique_pairs[:, 0]))
+            result = []
+            for index in order:
+                bucket_value, key = unique_pairs[index]
+                item = {
+                    "key": self._decode(group_by, int(key)) if group_by else "全部",
+                    "total": round(float(totals[index]), 2),
+                    "count": int(counts[index]),
+                }
+                if buckets is not None:
+                    unit = {"day": "D", "week": "D", "month": "M", "year": "Y"}[bucket]
+                    item["bucket"] = str(np.datetime64(int(bucket_value), unit))
+                result.append(item)
+            return result
@@ -1,32 +1,91 @@
+import sys
 import time
-from typing import Any, Dict
+import itertools
+from typing import Any, Dict, Optional
 
 class Cache:
     _instance = None
-    
-    def __new__(cls):
+    _namespaces = {}
+    # 所有命名空间共享的版本号序列，保证不同租户的ETag不会相同
+    _versions = itertools.count(1)
+
+    def __new__(cls, namespace: Optional[str] = None):
+        if namespace is not None:
+            # 按命名空间隔离的缓存实例（多租户模式）
+            instance = cls._namespaces.get(namespace)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance._init_state()
+                cls._namespaces[namespace] = instance
+            return instance
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.data = {}
-            cls._instance.expire_time = 600  # 10分钟缓存
+            cls._instance._init_state()
         return cls._instance
-    
+
+    def _init_state(self):
+        self.data = {}
+        self.expire_time = 600  # 10分钟缓存
+        self.version = 0  # 每次写入递增，用于生成ETag
+
     def set(self, key: str, value: Any) -> None:
+        self.version = next(Cache._versions)
         self.data[key] = {
             "value": value,
-            "timestamp": time.time()
+            "timestamp": time.time(),
+            "version": self.version
         }
-    
-    def get(self, key: str) -> Any:
+
+    def get_entry(self, key: str) -> Optional[Dict]:
+        """返回完整的缓存条目（含版本号），可在条目上附加序列化结果等派生数据"""
         if key not in self.data:
             return None
-            
+
         cached = self.data[key]
         if time.time() - cached["timestamp"] > self.expire_time:
             del self.data[key]
             return None
-            
+
+        return cached
+
+    def get(self, key: str) -> Any:
+        cached = self.get_entry(key)
+        if cached is None:
+            return None
         return cached["value"]
 
+    def clear(self) -> None:
+        self.data = {}
+
+    def memory_usage(self) -> int:
+        """估算缓存占用的字节数：原始值的Python对象加上挂在条目上的序列化/压缩结果"""
+        size = sys.getsizeof(self.data)
+        for entry in list(self.data.values()):
+            size += _deep_size(entry.get("value"))
+            size += len(entry.get("json") or b"") + len(entry.get("gzip") or b"")
+        return size
+
+    @classmethod
+    def drop_namespace(cls, namespace: str) -> None:
+        cls._namespaces.pop(namespace, None)
+
+def _deep_size(value: Any) -> int:
+    """递归估算容器及其元素占用的字节数（同一对象只计一次）"""
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return size
+
 # 全局缓存实例
 global_cache = Cache()
@@ -5,15 +5,16 @@ import asyncio
 import traceback
 from typing import List
 from fastapi import FastAPI, Request, HTTPException, Body, Response
-from typing import Dict, List
-from fastapi.responses import HTMLResponse
+from typing import Dict, List, Optional
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from cache import global_cache as cache
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from env_settings import settings, UserConfigs
-from llm_client import FireflyTransactionAgent
-from firefly_api import  FireflyIIIAPIClient
+from env_settings import settings
+from tenants import TenantRegistry, Tenant, TenantAuthError
+from admission import RateLimiter, AdmissionGate, AdmissionRejected
+from http_cache import cached_json_response
+from tracing import span, start_trace, end_trace, write_trace, profiler
 from collections import Counter
 VERSION = "0.1.3"
 app = FastAPI()
@@ -46,10 +47,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-firefly =  FireflyIIIAPIClient(
-    base_url=settings.firefly_iii_url,
-    api_key=settings.firefly_iii_api_key
-)
+# 限流与并发控制
+rate_limiter = RateLimiter(settings.rate_limit_per_minute, settings.rate_limit_burst)
+llm_gate = AdmissionGate("AI解析服务", settings.llm_max_inflight, settings.admission_max_queue)
+firefly_gate = AdmissionGate("Firefly记账服务", settings.firefly_max_inflight, settings.admission_max_queue)
+
+# 租户注册表：未配置 TENANTS_FILE 时只有使用全局配置的默认租户
+tenants = TenantRegistry(settings, llm_gate)
+
+def get_tenant(request: Request) -> Tenant:
+    """按 X-Tenant-Key 请求头中的租户密钥取当前租户"""
+    return tenants.authenticate(request.headers.get("X-Tenant-Key"))
+
+@app.exception_handler(TenantAuthError)
+async def tenant_auth_error_handler(request: Request, exc: TenantAuthError):
+    return JSONResponse(status_code=401, content={"detail": str(exc)})
+
+def client_key(request: Request, tenant: Tenant) -> str:
+    """限流用的客户端标识：租户加来源IP（不信任客户端自报的标识，否则轮换即可绕过限流）"""
+    host = request.client.host if request.client else "unknown"
+    return f"{tenant.name or ''}:{host}"
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.on_event("startup")
+async def start_tenants():
+    tenants.start()
+
+@app.on_event("shutdown")
+async def stop_tenants():
+    await tenants.stop()
 
 # 自定义中间件：记录请求和响应
 @app.middleware("http")
@@ -94,6 +127,29 @@ async def log_middleware(request: Request, call_next):
     
     return response
 
+# 请求追踪中间件：返回 Server-Timing 响应头，按配置写追踪文件和慢请求采样分析
+@app.middleware("http")
+async def trace_middleware(request: Request, call_next):
+    trace, token = start_trace(f"{request.method} {request.url.path}")
+    profile = None
+    if settings.profile_slow_ms > 0:
+        profile = profiler.begin()
+    try:
+        response = await call_next(request)
+    finally:
+        end_trace(token)
+        if profile is not None:
+            profiler.end(profile)
+    response.headers["Server-Timing"] = trace.server_timing()
+    extra = {"status_code": response.status_code}
+    if profile is not None and trace.elapsed_ms >= settings.profile_slow_ms:
+        extra["profile"] = profiler.top(profile)
+        if not settings.trace_file:
+            print(f"慢请求 {trace.name} 耗时 {trace.elapsed_ms:.1f}ms，采样热点: {extra['profile'][:5]}")
+    if settings.trace_file:
+        write_trace(settings.trace_file, trace, extra)
+    return response
+
 @app.get("/", response_class=HTMLResponse)
 @app.get("/static", response_class=HTMLResponse)
 @app.get("/static/", response_class=HTMLResponse)
@@ -102,75 +158,133 @@ async def web_interface(request: Request):
         return HTMLResponse(content=f.read())
 
 @app.post("/api/parse")
-async def parse_transactions(text: str = Body(...)):
-    try:
-
-        parser = FireflyTransactionAgent()
-        transactions = parser.parse(text)
-        return transactions
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def parse_transactions(request: Request, text: str = Body(...)):
+    # 按非空行数估算交易条数作为工作量
+    cost = max(1, len([line for line in text.splitlines() if line.strip()]))
+    tenant = get_tenant(request)
+    rate_limiter.acquire(client_key(request, tenant), cost)
+    bulk = cost >= settings.bulk_threshold
+    if tenant.parse_batcher is not None and not bulk:
+        # 微批处理在发送批次时占用LLM并发名额，等待合批期间不占用
+        try:
+            return await tenant.parse_batcher.submit(text)
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    async with llm_gate.slot(bulk=bulk):
+        try:
+            parser = tenant.new_agent()
+            transactions = await asyncio.to_thread(parser.parse, text)
+            return transactions
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/record")
-async def record_transaction(transactions: List[dict]):
-    try:
-        # 使用settings中的配置
-        from mcp_server_main import record_expense
-        result = await record_expense(transactions, dry_run=False)
-        return {"message": "Transaction recorded successfully","result": result}
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+async def record_transaction(request: Request, transactions: List[dict]):
+    cost = max(1, len(transactions))
+    tenant = get_tenant(request)
+    rate_limiter.acquire(client_key(request, tenant), cost)
+    if tenant.outbox is not None:
+        try:
+            from mcp_server_main import queue_expense
+            result = queue_expense(transactions, tenant.outbox, tenant.cache)
+            return {"message": "Transaction queued successfully", "result": result, "outbox": tenant.outbox.stats()}
+        except Exception as e:
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+    async with firefly_gate.slot(bulk=cost >= settings.bulk_threshold):
+        try:
+            # 使用settings中的配置
+            from mcp_server_main import record_expense
+            result = await record_expense(transactions, dry_run=False, firefly=tenant.firefly)
+            # 补记的历史交易需要从最早的日期起重新拉取
+            tenant.snapshot.mark_stale(min((str(t["date"]) for t in transactions if t.get("date")), default=None))
+            return {"message": "Transaction recorded successfully","result": result}
+        except Exception as e:
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/outbox")
+async def get_outbox(request: Request):
+    tenant = get_tenant(request)
+    if tenant.outbox is None:
+        raise HTTPException(status_code=404, detail="未开启本地待发送队列")
+    return {**tenant.outbox.stats(), "failed_items": tenant.outbox.failed_items()}
+
+@app.post("/api/outbox/retry")
+async def retry_outbox(request: Request):
+    tenant = get_tenant(request)
+    if tenant.outbox is None:
+        raise HTTPException(status_code=404, detail="未开启本地待发送队列")
+    return {"message": "已重新加入待发送队列", "count": tenant.outbox.retry_failed()}
 
 @app.get("/api/tags-and-categories")
-async def get_tags_and_categories():
-    cached = cache.get("tags_and_categories")
-    if cached:
-        return cached
-        
-    categories = firefly.get_categories()
-    tags = firefly.get_tags()
-    result = {
-        "categories": list(categories.values()),
-        "tags": list(tags.values())
-    }
-    
-    cache.set("tags_and_categories", result)
-    return result
+async def get_tags_and_categories(request: Request):
+    tenant = get_tenant(request)
+
+    def load():
+        categories = tenant.firefly.get_categories()
+        tags = tenant.firefly.get_tags()
+        return {
+            "categories": list(categories.values()),
+            "tags": list(tags.values())
+        }
+
+    return await cached_json_response(request, tenant.cache, "tags_and_categories", load)
 
 @app.get("/api/accounts")
-async def get_accounts():
-    cached = cache.get("accounts")
-    if cached:
-        return cached
-        
+async def get_accounts(request: Request):
+    tenant = get_tenant(request)
     try:
-        accounts = firefly.get_accounts()
-        cache.set("accounts", accounts)
-        return accounts
+        return await cached_json_response(request, tenant.cache, "accounts", tenant.firefly.get_accounts)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取账户列表失败: {str(e)}")
 
 
 @app.get("/api/transactions")
-async def get_transactions():
+async def get_transactions(request: Request):
+    tenant = get_tenant(request)
     try:
-        if cache.get("transactions"):
-            return cache.get("transactions")
-        latest_tarnsactions = firefly.get_latest_transactions()
-        if latest_tarnsactions:
-            cache.set("transactions", latest_tarnsactions)
-        return latest_tarnsactions
+        return await cached_json_response(request, tenant.cache, "transactions", tenant.firefly.get_latest_transactions, cache_empty=False)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取最新交易失败: {str(e)}")
 
+@app.get("/api/summary")
+async def get_summary(
+    request: Request,
+    group_by: Optional[str] = None,
+    bucket: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    type: Optional[str] = "withdrawal",
+    refresh: bool = False,
+):
+    snapshot = get_tenant(request).snapshot
+    try:
+        # 刷新会分页拉取Firefly、汇总需要等待快照锁，都放到工作线程中避免阻塞事件循环
+        with span("snapshot_refresh"):
+            if refresh:
+                await asyncio.to_thread(snapshot.refresh)
+            else:
+                await asyncio.to_thread(snapshot.ensure_fresh)
+        with span("summary"):
+            return await asyncio.to_thread(
+                snapshot.summary, group_by=group_by, bucket=bucket, start=start, end=end, transaction_type=type
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取汇总统计失败: {str(e)}")
+
 @app.get("/api/default_account")
-async def get_default_account():
-    user_configs = UserConfigs()
+async def get_default_account(request: Request):
+    tenant = get_tenant(request)
+    user_configs = tenant.user_configs
     default_revenue_account = user_configs.get("default_revenue")
     default_expense_account = user_configs.get("default_expense")
     if default_revenue_account == str(-1) or default_expense_account == str(-1):
-        latest_tarnsactions = firefly.get_latest_transactions()
+        latest_tarnsactions = tenant.firefly.get_latest_transactions()
         source_ids = [t["source_id"] for t in latest_tarnsactions.values()]
         destination_ids = [t["destination_id"] for t in latest_tarnsactions.values()]
         # 出现最多的账户作为默认账户
@@ -179,15 +293,16 @@ async def get_default_account():
         user_configs.update("default_revenue", default_revenue_account)
         user_configs.update("default_expense", default_expense_account)
         user_configs.save()
-    default_configs = user_configs.configs
+    default_configs = user_configs.snapshot()
     default_configs["version"] = VERSION
-    default_configs["firefly_iii_url"] = settings.firefly_iii_url
+    default_configs["firefly_iii_url"] = tenant.config.firefly_iii_url
     return default_configs
 
 @app.post("/api/default")
-async def update_user_config(data: dict = Body(...)):
+async def update_user_config(request: Request, data: dict = Body(...)):
+    tenant = get_tenant(request)
     try:
-        user_configs = UserConfigs()
+        user_configs = tenant.user_configs
         for key, value in data.items():
             user_configs.update(key, value)
         user_configs.save()
@@ -1,5 +1,10 @@
 import os
 import json
+import time
+import atexit
+import stat
+import tempfile
+import threading
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,37 +13,207 @@ class Settings(BaseSettings):
     openai_api_base: str
     openai_api_key: str
     openai_model_name: str
+    # 解析请求微批处理窗口（毫秒），0 表示关闭
+    parse_batch_window_ms: int = 0
+    # 单个批次最多合并的解析请求数
+    parse_batch_max_size: int = 8
+    # 请求追踪记录文件（JSON Lines），为空则不写文件
+    trace_file: str = ""
+    # 超过该耗时（毫秒）的请求记录采样分析结果，0 表示关闭
+    profile_slow_ms: int = 0
+    # 每个客户端每分钟可处理的交易条数（令牌桶补充速率），0 表示不限流
+    rate_limit_per_minute: int = 120
+    # 每个客户端令牌桶容量
+    rate_limit_burst: int = 60
+    # 同时进行的LLM解析数和Firefly记账数上限，0 表示不限制
+    llm_max_inflight: int = 4
+    firefly_max_inflight: int = 8
+    # 排队数超过该值时直接返回429
+    admission_max_queue: int = 16
+    # 交易条数达到该值的请求视为大批量导入，只占用一半并发名额
+    bulk_threshold: int = 20
+    # 记账先写入本地队列再由后台发送到Firefly，关闭后 /api/record 同步等待Firefly
+    record_outbox: bool = True
+    # 本地待发送队列的数据库文件
+    outbox_db: str = "outbox.db"
+    # 后台发送到Firefly的最大并发数
+    outbox_concurrency: int = 4
+    # 多租户配置文件（JSON，{租户名: {firefly_iii_url, firefly_iii_api_key, openai_api_key, ...}}），为空则为单用户模式
+    tenants_file: str = ""
+    # 各租户的用户配置和待发送队列存放目录
+    tenant_data_dir: str = "tenants"
+    # 租户空闲超过该时间（秒）后释放其客户端和缓存
+    tenant_idle_seconds: int = 1800
+    # 单个租户缓存和统计快照的内存上限（MB），超过后清空重建
+    tenant_max_memory_mb: int = 64
 
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
         case_sensitive = False
 
+# 进程的 umask，新建配置文件时用于计算默认权限
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 class UserConfigs():
-    def __init__(self):
-        self.configs = {}
-        self.filepath = "user_configs.json"
-        self.load()
-    
-    def load(self):
+    """
+    进程内共享的用户配置存储
+
+    同一个文件路径只对应一个实例，读取直接走内存；写入在锁内更新内存，
+    再通过防抖的后台写（临时文件 + os.replace 原子替换）落盘。
+    文件被外部修改时（mtime 变化）会自动重新加载。
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    save_delay = 0.5  # 写盘防抖时间（秒）
+    check_interval = 1.0  # 检查文件外部变更的最小间隔（秒）
+
+    def __new__(cls, filepath="user_configs.json"):
+        key = os.path.abspath(filepath)
+        with cls._instances_lock:
+            instance = cls._instances.get(key)
+            if instance is None:
+                instance = super().__new__(cls)
+                instance.filepath = filepath
+                instance.configs = {}
+                instance._lock = threading.RLock()
+                instance._write_lock = threading.Lock()
+                instance._timer = None
+                instance._dirty = False
+                instance._mtime = None
+                instance._last_check = 0.0
+                instance.load()
+                cls._instances[key] = instance
+        return instance
+
+    def __init__(self, filepath="user_configs.json"):
+        # 状态已在 __new__ 中初始化，重复构造直接复用共享实例
+        pass
+
+    def _file_mtime(self):
         try:
-            with open(self.filepath, "r", encoding="utf-8") as f:
-                self.configs = json.load(f)
+            return os.stat(self.filepath).st_mtime_ns
         except FileNotFoundError:
-            self.configs = {}
-        except json.JSONDecodeError:
-            self.configs = {}
-        return self.configs
-    
+            return None
+
+    def load(self):
+        with self._lock:
+            try:
+                with open(self.filepath, "r", encoding="utf-8") as f:
+                    self.configs = json.load(f)
+            except FileNotFoundError:
+                self.configs = {}
+            except json.JSONDecodeError:
+                self.configs = {}
+            self._mtime = self._file_mtime()
+            self._last_check = time.monotonic()
+            return self.configs
+
+    def _reload_if_changed(self):
+        """文件被外部修改时重新加载，有未落盘的修改时以内存为准"""
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            self._last_check = now
+            if self._dirty:
+                return
+            if self._file_mtime() != self._mtime:
+                self.load()
+
     def update(self, key, value):
-        self.configs[key] = value
-    
+        with self._lock:
+            self.configs[key] = value
+            self._dirty = True
+
     def save(self):
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            json.dump(self.configs, f, ensure_ascii=False, indent=4)
-    
+        """安排一次防抖写盘，立即返回"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """
+        立即将内存中的配置原子写入文件
+
+        只在锁内复制配置，写盘在锁外进行，读取不会等待磁盘IO；
+        多个写盘操作之间由 _write_lock 串行化。
+        """
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                configs = dict(self.configs)
+                self._dirty = False
+            try:
+                self._write(configs)
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+            with self._lock:
+                self._mtime = self._file_mtime()
+
+    def _write(self, configs: dict):
+        directory = os.path.dirname(os.path.abspath(self.filepath))
+        try:
+            # 保留原文件权限，mkstemp 创建的临时文件默认是 0600
+            mode = stat.S_IMODE(os.stat(self.filepath).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        fd, tmp_path = tempfile.mkstemp(prefix=".user_configs.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(configs, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.filepath)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
     def get(self, key, default=None):
-        return self.configs.get(key, default)
+        self._reload_if_changed()
+        with self._lock:
+            return self.configs.get(key, default)
+
+    def snapshot(self) -> dict:
+        """返回当前配置的副本，调用方修改不会影响共享配置"""
+        self._reload_if_changed()
+        with self._lock:
+            return dict(self.configs)
+
+    @classmethod
+    def release(cls, filepath):
+        """落盘并移除某个文件对应的共享实例（租户被回收时调用）"""
+        with cls._instances_lock:
+            instance = cls._instances.pop(os.path.abspath(filepath), None)
+        if instance is not None:
+            instance.flush()
+
+    @classmethod
+    def flush_all(cls):
+        with cls._instances_lock:
+            instances = list(cls._instances.values())
+        for instance in instances:
+            try:
+                instance.flush()
+            except Exception as e:
+                print(f"保存用户配置失败: {e}")
+
+# 进程退出前把尚未落盘的配置写入文件
+atexit.register(UserConfigs.flush_all)
 
 def load_settings():
     try:
@@ -1,18 +1,21 @@
 import aiohttp
 import requests
 from typing import Dict, Any
+from tracing import span
 
 class FireflyIIIAPIClient:
     """Firefly III API 调用客户端"""
     
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, timeout: float = 30):
         """
         初始化客户端
         
         :param base_url: API 基础地址（例如：https://api.firefly-iii.org）
         :param api_key: 身份验证API密钥（若需要）
+        :param timeout: 请求超时时间（秒），避免Firefly无响应时一直挂起
         """
         self.base_url = base_url.rstrip('/')  # 确保基础地址格式正确
+        self.timeout = timeout
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json",
@@ -33,15 +36,26 @@ class FireflyIIIAPIClient:
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            async with session.request(
-                method=method.upper(),
-                url=url,
-                headers=self.headers,
-                params=params,
-                json=data
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
+            with span(f"firefly_{method.lower()}"):
+                async with session.request(
+                    method=method.upper(),
+                    url=url,
+                    headers=self.headers,
+                    params=params,
+                    json=data,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as response:
+                    if response.status >= 400:
+                        # 带上响应体，便于调用方区分错误原因（如重复交易）
+                        body = await response.text()
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                            message=body[:500] or response.reason,
+                            headers=response.headers
+                        )
+                    return await response.json()
         except Exception as e:
             print(f"异步API请求失败：{e}")
             raise
@@ -59,15 +73,17 @@ class FireflyIIIAPIClient:
         """
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.request(
-                method=method.upper(),
-                url=url,
-                headers=self.headers,
-                params=params,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
+            with span(f"firefly_{method.lower()}"):
+                response = requests.request(
+                    method=method.upper(),
+                    url=url,
+                    headers=self.headers,
+                    params=params,
+                    json=data,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                return response.json()
         except requests.exceptions.RequestException as e:
             print(f"API请求失败：{e}")
             raise
@@ -174,6 +190,24 @@ class FireflyIIIAPIClient:
                 "destination_id": transaction_item.get("destination_id"),
             }
         return simplified_transactions
+
+    def get_transactions_page(self, page=1, limit=100, start: str = None, end: str = None) -> Dict:
+        """
+        分页获取交易记录（按日期倒序）
+
+        :param page: 页码，从1开始
+        :param limit: 每页数量（默认为100）
+        :param start: 起始日期（可选，格式：YYYY-MM-DD）
+        :param end: 结束日期（可选，格式：YYYY-MM-DD）
+        :return: 接口原始响应，包含data和meta.pagination
+        """
+        params = {"page": page, "limit": limit}
+        if start:
+            params["start"] = start
+        if end:
+            params["end"] = end
+        return self._send_request(method="GET", endpoint="/api/v1/transactions", params=params)
+
     def create_transaction_with_template(
         self,
         transaction_type: str,
@@ -5,6 +5,37 @@ const api = axios.create({
   timeout: 100000
 })
 
+// 多租户模式下的租户密钥，保存在本地，通过 X-Tenant-Key 请求头发送
+const TENANT_KEY_STORAGE = 'tenantKey'
+
+api.interceptors.request.use(config => {
+  const key = localStorage.getItem(TENANT_KEY_STORAGE)
+  if (key) {
+    config.headers['X-Tenant-Key'] = key
+  }
+  return config
+})
+
+// 返回401时提示输入租户密钥，保存后重试一次
+api.interceptors.response.use(null, error => {
+  const config = error.config
+  if (error.response?.status !== 401 || !config || config._tenantKeyRetried) {
+    return Promise.reject(error)
+  }
+  const sent = config.headers?.['X-Tenant-Key']
+  let key = localStorage.getItem(TENANT_KEY_STORAGE)
+  // 并发请求中已有一个输入了新密钥时直接重试
+  if (!key || key === sent) {
+    key = window.prompt('请输入租户密钥', '')?.trim()
+    if (!key) {
+      return Promise.reject(error)
+    }
+    localStorage.setItem(TENANT_KEY_STORAGE, key)
+  }
+  config._tenantKeyRetried = true
+  return api(config)
+})
+
 export default {
   parseTransactions(text) {
     return api.post('/parse', text, {
@@ -0,0 +1,72 @@
+import gzip
+import asyncio
+import json
+import uuid
+from typing import Any, Callable
+from fastapi import Request, Response
+from cache import Cache
+from tracing import span
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回标准库
+    orjson = None
+
+# 进程启动标识，保证重启后旧的ETag不会误命中
+BOOT_ID = uuid.uuid4().hex[:8]
+
+# 小于该字节数的响应不压缩
+GZIP_MIN_SIZE = 512
+
+
+def json_bytes(value: Any) -> bytes:
+    """序列化为UTF-8 JSON字节，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+async def cached_json_response(request: Request, cache: Cache, key: str, loader: Callable[[], Any],
+                         cache_empty: bool = True) -> Response:
+    """
+    返回带ETag的缓存JSON响应
+
+    序列化结果和gzip压缩结果直接挂在缓存条目上，缓存有效期内只计算一次；
+    ETag 由进程标识和缓存版本号组成，If-None-Match 命中时返回304。
+
+    :param request: 当前请求
+    :param cache: 缓存实例
+    :param key: 缓存键
+    :param loader: 缓存未命中时获取数据的同步函数，在工作线程中执行，不阻塞事件循环
+    :param cache_empty: 结果为空时是否写入缓存
+    """
+    entry = cache.get_entry(key)
+    if entry is None:
+        value = await asyncio.to_thread(loader)
+        if not value and not cache_empty:
+            return Response(content=json_bytes(value), media_type="application/json")
+        cache.set(key, value)
+        entry = cache.get_entry(key)
+
+    etag = f'"{BOOT_ID}-{entry["version"]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding, X-Tenant-Key"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    body = entry.get("json")
+    if body is None:
+        with span("serialize"):
+            body = entry["json"] = json_bytes(entry["value"])
+    if len(body) >= GZIP_MIN_SIZE and _accepts_gzip(request):
+        compressed = entry.get("gzip")
+        if compressed is None:
+            with span("gzip"):
+                compressed = entry["gzip"] = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=compressed, media_type="application/json", headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
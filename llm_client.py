@@ -5,22 +5,33 @@ from firefly_api import FireflyIIIAPIClient
 from env_settings import settings
 from typing import List, Dict
 from cache import global_cache
+from tracing import span, start_trace, end_trace, current_trace
+import asyncio
+import contextvars
 
 class FireflyTransactionAgent:
-    def __init__(self):
+    def __init__(self, config=None, cache=None, firefly: FireflyIIIAPIClient = None):
+        """
+        :param config: 配置（Settings），默认使用全局配置；多租户模式下传入租户配置
+        :param cache: 分类和标签使用的缓存，默认使用全局缓存
+        :param firefly: Firefly III API 客户端，默认按配置新建
+        """
+        config = config or settings
+        self.cache = cache or global_cache
         self.llm = init_chat_model(
-            "deepseek-chat",
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
+            config.openai_model_name,
+            api_key=config.openai_api_key,
+            base_url=config.openai_api_base,
             model_provider="deepseek",
         )
-        self.firefly = FireflyIIIAPIClient(
-            base_url=settings.firefly_iii_url,
-            api_key=settings.firefly_iii_api_key
+        self.firefly = firefly or FireflyIIIAPIClient(
+            base_url=config.firefly_iii_url,
+            api_key=config.firefly_iii_api_key
         )
         self.parser = JsonOutputParser()
         self.prompt = self.generate_prompt("")
         self.chain = self.prompt | self.llm | self.parser
+        self.batch_chain = self.generate_batch_prompt() | self.llm | self.parser
     
     def generate_prompt(self, text: str) -> str:
 
@@ -64,26 +75,71 @@ class FireflyTransactionAgent:
         """)
         return self.prompt
 
+    def generate_batch_prompt(self):
+        """多条输入合并为一次调用的提示词，每条输入带编号，输出按编号分组"""
+        return ChatPromptTemplate.from_template("""
+            下面有多段相互独立的交易记录文本，每段以 [#编号] 开头。请分别将每段解析为交易列表，要求包含以下字段：
+            - date: 交易日期（格式：YYYY-MM-DDTHH:mm）
+            - description: 交易描述
+            - amount: 交易金额
+            - category: 交易分类
+            - tags: 交易标签列表
+            交易的分类你需要根据用户输入内存中的描述，从{categories}中选择合适的分类[category]，然后从{tags}中选择合适的一个标签，标签必须以刚刚选择出来的[category]开头，如果无法匹配则可以以这个规则新建一个。
+            不同编号的文本之间不要混用日期或交易。
+            示例输入：
+            [#1]
+            07.06
+            - 12.00 午餐 66
+            [#2]
+            - 16.00 物业费 900
+
+            示例输出：
+            {{
+                "results": [
+                    {{
+                        "id": 1,
+                        "transactions": [
+                            {{"date": "2025-07-06T12:00", "description": "午餐", "amount": 66, "category": "餐饮", "tags": ["餐饮-午餐"]}}
+                        ],
+                        "think_result": "对第1段的思考过程与总结结果"
+                    }},
+                    {{
+                        "id": 2,
+                        "transactions": [
+                            {{"date": "2025-07-06T16:00", "description": "物业费", "amount": 900, "category": "居家", "tags": ["居家-物业费"]}}
+                        ],
+                        "think_result": "对第2段的思考过程与总结结果"
+                    }}
+                ]
+            }}
+
+            实际输入：
+            {input_text}
+        """)
+
     def get_tags_and_categories(self) -> Dict[str, List[str]]:
         """获取Firefly III的分类和标签"""
-        cached = global_cache.get("tags_and_categories")
+        with span("cache"):
+            cached = self.cache.get("tags_and_categories")
         if cached:
             print("使用缓存的分类和标签")
             return cached
-        categories = self.firefly.get_categories()
-        tags = self.firefly.get_tags()
+        with span("tags_and_categories"):
+            categories = self.firefly.get_categories()
+            tags = self.firefly.get_tags()
         categories_and_tags = {
             "tags": tags,
             "categories": categories
         }
-        global_cache.set("tags_and_categories", categories_and_tags)
+        self.cache.set("tags_and_categories", categories_and_tags)
         return categories_and_tags
     def parse(self, text: str) -> Dict:
         try:
             tags_and_categories = self.get_tags_and_categories()
             categories = tags_and_categories.get("categories", [])
             tags = tags_and_categories.get("tags", [])
-            result = self.chain.invoke({"input_text": text, "categories": categories, "tags": tags})
+            with span("llm"):
+                result = self.chain.invoke({"input_text": text, "categories": categories, "tags": tags})
             return {
                 "transactions": result.get("transactions", []),
                 "think_result": result.get("think_result", "AI思考结果未返回")
@@ -92,6 +148,127 @@ class FireflyTransactionAgent:
             print(f"解析失败: {str(e)}")
             return {"transactions": [], "think_result": f"解析失败: {str(e)}"}
 
+    def parse_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        将多段文本合并为一次LLM调用解析，按输入顺序返回每段的解析结果
+
+        模型漏掉的编号会单独回退到 parse 重新解析。
+        """
+        if len(texts) == 1:
+            return [self.parse(texts[0])]
+        try:
+            tags_and_categories = self.get_tags_and_categories()
+            categories = tags_and_categories.get("categories", [])
+            tags = tags_and_categories.get("tags", [])
+            input_text = "\n".join(f"[#{idx}]\n{text}" for idx, text in enumerate(texts, 1))
+            with span("llm_batch"):
+                result = self.batch_chain.invoke({"input_text": input_text, "categories": categories, "tags": tags})
+            by_id = {}
+            for item in result.get("results", []):
+                try:
+                    by_id[int(item.get("id"))] = item
+                except (TypeError, ValueError):
+                    continue
+        except Exception as e:
+            print(f"批量解析失败，逐条解析: {str(e)}")
+            by_id = {}
+
+        results = []
+        for idx, text in enumerate(texts, 1):
+            item = by_id.get(idx)
+            if item is None:
+                results.append(self.parse(text))
+                continue
+            results.append({
+                "transactions": item.get("transactions", []),
+                "think_result": item.get("think_result", "AI思考结果未返回")
+            })
+        return results
+
+
+class ParseBatcher:
+    """
+    解析请求微批处理器
+
+    在 window_ms 时间窗口内到达的解析请求合并为一次 parse_batch 调用，
+    共享一份分类/标签提示词，再把结果分发回各自的调用方。
+    批次在独立的上下文中运行，自己的追踪记录（llm_batch 等阶段）完成后并入每个参与请求的追踪，
+    因此批次中每个请求的 Server-Timing 都包含这些阶段。
+    """
+
+    def __init__(self, window_ms: int, max_size: int = 8, agent_factory=FireflyTransactionAgent, gate=None):
+        """
+        :param window_ms: 收集请求的时间窗口（毫秒）
+        :param max_size: 单个批次最多合并的请求数，达到后立即发送
+        :param agent_factory: 创建解析器的函数，多租户模式下绑定租户配置
+        :param gate: LLM并发闸门（AdmissionGate），每个批次只占用一个名额
+        """
+        self.window = window_ms / 1000
+        self.max_size = max(1, max_size)
+        self.agent_factory = agent_factory
+        self.gate = gate
+        self._agent = None
+        self._pending = []
+        self._timer = None
+        # 保留批次任务的引用，事件循环只持有任务的弱引用
+        self._tasks = set()
+
+    @property
+    def agent(self) -> FireflyTransactionAgent:
+        if self._agent is None:
+            self._agent = self.agent_factory()
+        return self._agent
+
+    async def submit(self, text: str) -> Dict:
+        """提交一段文本，等待所在批次解析完成后返回该文本的结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, current_trace()))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        with span("parse_batch_wait"):
+            return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # 不继承触发本次发送的那个请求的上下文（包括它的追踪对象）
+            task = asyncio.create_task(self._run(batch), context=contextvars.Context())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        texts = [text for text, _, _ in batch]
+        batch_trace, token = start_trace("parse_batch")
+        try:
+            if self.gate is not None:
+                async with self.gate.slot():
+                    results = await asyncio.to_thread(self.agent.parse_batch, texts)
+            else:
+                results = await asyncio.to_thread(self.agent.parse_batch, texts)
+        except Exception as e:
+            results = None
+            error = e
+        finally:
+            end_trace(token)
+            # 先并入各请求的追踪，再唤醒调用方，保证生成响应头时阶段已记录
+            for _, _, trace in batch:
+                if trace is not None:
+                    trace.merge(batch_trace)
+        if results is None:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
 if __name__ == "__main__":
     parser = FireflyTransactionAgent()
     test_text = """07.06
@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, Any, List
 from firefly_api import FireflyIIIAPIClient
 from env_settings import settings
+from tracing import span
+from cache import global_cache
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -29,9 +31,71 @@ client = FireflyIIIAPIClient(
 
 
 
+def build_transaction(
+    transaction: dict,
+    categories: Optional[Dict] = None,
+    existing_tags: Optional[Dict] = None
+):
+    """
+    校验单笔交易并构造Firefly III创建交易的请求体
+
+    Args:
+        transaction: 交易数据，字段同 record_expense
+        categories: {分类ID: 分类名称}，为None时跳过分类和标签校验
+        existing_tags: {标签ID: 标签名称}
+    Returns:
+        (created_data, error_msg)，校验失败时 created_data 为None
+    """
+    # 设置默认值
+    description = transaction.get('description')
+    amount = transaction.get('amount')
+    date = transaction.get('date', datetime.now().strftime("%Y-%m-%dT%H:%M"))
+    category = transaction.get('category', "餐饮")
+    tags = transaction.get('tags', [f"{category}-{description}"])
+
+    # 验证分类和标签
+    if categories is not None:
+        if category not in categories.values():
+            error_msg = f"分类 '{category}' 不存在，分类可选项: {list(categories.values())}"
+            logger.warning(f"交易验证失败: {error_msg}")
+            return None, error_msg
+
+        category_tags = [tag for tag in (existing_tags or {}).values() if tag.startswith(category)]
+        if not all(tag in existing_tags.values() for tag in category_tags):
+            error_msg = f"标签 '{tags}' 不存在，标签可选项: {category_tags}"
+            logger.warning(f"交易验证失败: {error_msg}")
+            return None, error_msg
+
+    created_data = {
+                "error_if_duplicate_hash": False,
+                "apply_rules": False,
+                "fire_webhooks": True,
+                "group_title": description,
+                "transactions": [{
+                    "type": "withdrawal",
+                    "date": date,
+                    "amount": str(amount),
+                    "description": description,
+                    "source_id": "1",
+                    "source_name": "招行",
+                    "reconciled": False,
+                    "destination_id": "4",
+                    "destination_name": "招行",
+                    "category_name": category,
+                    "tags": tags,
+                    "foreign_amount": "0",
+                    "foreign_currency_id": None,
+                    "currency_id": "20",
+                    "budget_id": 1
+                }]
+            }
+    return created_data, None
+
+
 async def record_expense(
     transactions: List[dict],
-    dry_run: Optional[bool] = False
+    dry_run: Optional[bool] = False,
+    firefly: Optional[FireflyIIIAPIClient] = None
 ):
     """
     批量记录支出交易
@@ -43,68 +107,28 @@ async def record_expense(
             - date: 交易日期（格式：YYYY-MM-DDT HH:mm，如"2025-05-25T11:49"）
             - category: 交易分类 (如"餐饮", 默认为"餐饮")
             - tags: 交易标签列表 (如["餐饮-晚餐"], 默认为根据分类匹配)
+        dry_run: 只校验不发送
+        firefly: Firefly III API 客户端，默认使用全局客户端（多租户模式下传入租户客户端）
     """
+    firefly = firefly or client
     results = []
-    categories = client.get_categories()
-    existing_tags = client.get_tags()
+    categories = firefly.get_categories()
+    existing_tags = firefly.get_tags()
     
     logger.info(f"开始处理 {len(transactions)} 笔交易")
     async with aiohttp.ClientSession() as session:
         tasks = []
         for idx, transaction in enumerate(transactions, 1):
             logger.info(f"处理第 {idx} 笔交易: {transaction.get('description')}")
-            # 设置默认值
-            description = transaction.get('description')
-            amount = transaction.get('amount')
-            date = transaction.get('date', datetime.now().strftime("%Y-%m-%dT%H:%M"))
-            category = transaction.get('category', "餐饮")
-            tags = transaction.get('tags', [f"{category}-{description}"])
-            
-            # 验证分类和标签
-            if category not in categories.values():
-                error_msg = f"分类 '{category}' 不存在，分类可选项: {list(categories.values())}"
-                logger.warning(f"交易验证失败: {error_msg}")
-                results.append({
-                    "error": error_msg,
-                    "transaction": transaction
-                })
-                continue
-                
-            category_tags = [tag for tag in existing_tags.values() if tag.startswith(category)]
-            if not all(tag in existing_tags.values() for tag in category_tags):
-                error_msg = f"标签 '{tags}' 不存在，标签可选项: {list(category_tags.values())}"
-                logger.warning(f"交易验证失败: {error_msg}")
+            created_data, error_msg = build_transaction(transaction, categories, existing_tags)
+            if error_msg:
                 results.append({
                     "error": error_msg,
                     "transaction": transaction
                 })
                 continue
             
-            logger.info(f"准备发送交易请求: {description}, 金额: {amount}, 分类: {category}")
-            # 创建异步任务
-            created_data = {
-                        "error_if_duplicate_hash": False,
-                        "apply_rules": False,
-                        "fire_webhooks": True,
-                        "group_title": description,
-                        "transactions": [{
-                            "type": "withdrawal",
-                            "date": date,
-                            "amount": str(amount),
-                            "description": description,
-                            "source_id": "1",
-                            "source_name": "招行",
-                            "reconciled": False,
-                            "destination_id": "4",
-                            "destination_name": "招行",
-                            "category_name": category,
-                            "tags": tags,
-                            "foreign_amount": "0",
-                            "foreign_currency_id": None,
-                            "currency_id": "20",
-                            "budget_id": 1
-                        }]
-                    }
+            logger.info(f"准备发送交易请求: {transaction.get('description')}, 金额: {transaction.get('amount')}, 分类: {created_data['transactions'][0]['category_name']}")
             if dry_run:
                 logger.info(f"Dry run: {created_data}")
                 results.append({
@@ -114,7 +138,7 @@ async def record_expense(
                 })
                 continue
             task = asyncio.create_task(
-                client._async_send_request(
+                firefly._async_send_request(
                     session,
                     method="POST",
                     endpoint="/api/v1/transactions",
@@ -126,7 +150,8 @@ async def record_expense(
         # 等待所有任务完成
         for transaction, task in tasks:
             try:
-                response = await task
+                with span("record_wait"):
+                    response = await task
                 logger.info(f"交易处理成功: {transaction.get('description')}")
                 results.append({
                     "success": True,
@@ -150,6 +175,82 @@ async def record_expense(
     }
 
 
+
+# 入队校验使用的分类和标签缓存键
+VALIDATION_LISTS_KEY = "record_categories_and_tags"
+
+
+def get_validation_lists(cache=None):
+    """
+    从缓存获取校验用的分类和标签，不访问Firefly
+
+    没有缓存时返回 (None, None)，此时跳过校验，交易仍可入队。
+    """
+    cache = cache or global_cache
+    cached = cache.get(VALIDATION_LISTS_KEY)
+    if cached:
+        return cached["categories"], cached["tags"]
+    return None, None
+
+
+def refresh_validation_lists(firefly: Optional[FireflyIIIAPIClient] = None, cache=None):
+    """
+    从Firefly拉取分类和标签并写入缓存，由 outbox 在后台线程中定期调用
+
+    Args:
+        firefly: Firefly III API 客户端，默认使用全局客户端
+        cache: 写入的缓存，默认使用全局缓存
+    """
+    firefly = firefly or client
+    cache = cache or global_cache
+    categories = firefly.get_categories()
+    existing_tags = firefly.get_tags()
+    cache.set(VALIDATION_LISTS_KEY, {"categories": categories, "tags": existing_tags})
+
+
+def queue_expense(transactions: List[dict], outbox, cache=None):
+    """
+    校验交易并写入本地待发送队列，立即返回，由 outbox 在后台发送到Firefly
+
+    只使用缓存中的分类和标签校验，不会同步访问Firefly；缓存为空时跳过校验，
+    并通知 outbox 尽快在后台刷新。
+
+    Args:
+        transactions: 交易列表，字段同 record_expense
+        outbox: Outbox 实例
+        cache: 校验列表使用的缓存，默认使用全局缓存
+    """
+    results = []
+    categories, existing_tags = get_validation_lists(cache)
+    if categories is None:
+        outbox.request_refresh()
+    for transaction in transactions:
+        created_data, error_msg = build_transaction(transaction, categories, existing_tags)
+        if error_msg:
+            results.append({
+                "error": error_msg,
+                "transaction": transaction
+            })
+            continue
+        outbox_id = outbox.enqueue(created_data, transaction)
+        results.append({
+            "success": True,
+            "queued": True,
+            "outbox_id": outbox_id,
+            "validated": categories is not None,
+            "transaction": transaction
+        })
+
+    success_count = len([r for r in results if r.get("success")])
+    error_count = len([r for r in results if r.get("error")])
+    logger.info(f"入队完成, 成功: {success_count} 笔, 失败: {error_count} 笔")
+    return {
+        "results": results,
+        "success_count": success_count,
+        "error_count": error_count
+    }
+
+
 if __name__ == "__main__":
     # Run the server
     mcp.run()
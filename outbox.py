@@ -0,0 +1,281 @@
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import contextvars
+import threading
+import aiohttp
+from typing import Callable, Dict, List, Optional
+from firefly_api import FireflyIIIAPIClient
+
+logger = logging.getLogger("FireflyOutbox")
+
+
+class Outbox:
+    """
+    待记账交易的本地持久化队列（SQLite）
+
+    /api/record 只负责把校验通过的交易写入队列，后台的 flusher 再按以下规则发往 Firefly III：
+    - 同一天的交易严格按入队顺序逐条发送，不同日期之间并发，最多 concurrency 条同时进行
+    - 发送失败按指数退避重试；Firefly 返回 4xx（429 除外）视为数据错误，标记为 failed 不再重试
+    - 请求体强制开启 error_if_duplicate_hash，并在每笔交易的 internal_reference 中写入 outbox:<记录ID>，
+      只有同一条记录的重试才会命中重复校验：Firefly 已入账但响应丢失时，重试得到重复交易的422，
+      视为发送成功，避免重复记账；内容相同的不同交易仍会分别入账
+    - 成功后删除该条记录，进程重启后未发送的交易会继续发送
+    """
+
+    def __init__(self, db_path: str, firefly: FireflyIIIAPIClient, concurrency: int = 4,
+                 poll_interval: float = 1.0, base_backoff: float = 2.0, max_backoff: float = 300.0,
+                 on_sent: Optional[Callable[[str], None]] = None,
+                 refresh_hook: Optional[Callable[[], None]] = None, refresh_interval: float = 300.0):
+        """
+        :param db_path: SQLite 数据库文件路径
+        :param firefly: Firefly III API 客户端
+        :param concurrency: 最大并发发送数
+        :param poll_interval: 空闲时检查队列的间隔（秒）
+        :param base_backoff: 首次重试等待时间（秒）
+        :param max_backoff: 最长重试等待时间（秒）
+        :param on_sent: 有交易发送成功时的回调，参数为交易日期
+        :param refresh_hook: 定期在工作线程中执行的同步刷新函数（如入队校验用的分类和标签）
+        :param refresh_interval: refresh_hook 的执行间隔（秒）
+        """
+        self.firefly = firefly
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.on_sent = on_sent
+        self.refresh_hook = refresh_hook
+        self.refresh_interval = refresh_interval
+        self._next_refresh = 0.0
+        self._refresh_task = None
+        self._db_lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                day TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                source TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_day ON outbox (status, day, id)")
+        self._conn.commit()
+        self._in_flight_days = set()
+        self._send_tasks = set()
+        self._wakeup = None
+        self._task = None
+        self._session = None
+        self.last_error = None
+
+    def _execute(self, sql: str, params=()) -> List[tuple]:
+        with self._db_lock:
+            cursor = self._conn.execute(sql, params)
+            rows = cursor.fetchall()
+            self._conn.commit()
+            return rows
+
+    def enqueue(self, payload: Dict, transaction: Dict) -> int:
+        """
+        写入一笔待发送交易
+
+        :param payload: 发往 /api/v1/transactions 的请求体
+        :param transaction: 用户提交的原始交易，便于排查
+        :return: 队列中的记录ID
+        """
+        day = str(payload["transactions"][0].get("date") or "")[:10]
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "INSERT INTO outbox (day, payload, source, created_at) VALUES (?, ?, ?, ?)",
+                (day, "", json.dumps(transaction, ensure_ascii=False), time.time())
+            )
+            outbox_id = cursor.lastrowid
+            # 记录ID参与Firefly的重复校验哈希，保证只有本条记录的重试会被判为重复
+            payload = {
+                **payload,
+                "error_if_duplicate_hash": True,
+                "transactions": [
+                    {**split, "internal_reference": split.get("internal_reference") or f"outbox:{outbox_id}"}
+                    for split in payload["transactions"]
+                ],
+            }
+            self._conn.execute(
+                "UPDATE outbox SET payload = ? WHERE id = ?",
+                (json.dumps(payload, ensure_ascii=False), outbox_id)
+            )
+            self._conn.commit()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return outbox_id
+
+    def stats(self) -> Dict:
+        """队列深度、最早待发送记录的等待时长等状态"""
+        now = time.time()
+        pending, oldest, retrying = self._execute(
+            "SELECT COUNT(*), MIN(created_at), SUM(attempts > 0) FROM outbox WHERE status = 'pending'"
+        )[0]
+        failed = self._execute("SELECT COUNT(*) FROM outbox WHERE status = 'failed'")[0][0]
+        return {
+            "depth": pending,
+            "oldest_age_seconds": round(now - oldest, 1) if oldest else 0,
+            "retrying": retrying or 0,
+            "failed": failed,
+            "in_flight": len(self._in_flight_days),
+            "last_error": self.last_error,
+        }
+
+    def failed_items(self, limit: int = 20) -> List[Dict]:
+        rows = self._execute(
+            "SELECT id, source, attempts, last_error, created_at FROM outbox WHERE status = 'failed' ORDER BY id LIMIT ?",
+            (limit,)
+        )
+        return [
+            {"id": row[0], "transaction": json.loads(row[1]), "attempts": row[2], "error": row[3], "created_at": row[4]}
+            for row in rows
+        ]
+
+    def retry_failed(self) -> int:
+        """把 failed 的记录重新放回待发送队列"""
+        with self._db_lock:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt = 0 WHERE status = 'failed'"
+            )
+            self._conn.commit()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return cursor.rowcount
+
+    def _due_heads(self, limit: int) -> List[tuple]:
+        """每个日期中最早的一条待发送记录，已到重试时间且该日期没有正在发送的记录"""
+        rows = self._execute("""
+            SELECT o.id, o.day, o.payload, o.attempts, o.next_attempt FROM outbox o
+            JOIN (SELECT day, MIN(id) AS id FROM outbox WHERE status = 'pending' GROUP BY day) h ON o.id = h.id
+            ORDER BY o.id
+        """)
+        now = time.time()
+        heads = [row for row in rows if row[1] not in self._in_flight_days and row[4] <= now]
+        return heads[:limit]
+
+    def _mark_sent(self, outbox_id: int, day: str):
+        self._execute("DELETE FROM outbox WHERE id = ?", (outbox_id,))
+        if self.on_sent is not None:
+            self.on_sent(day)
+
+    async def _send(self, outbox_id: int, day: str, payload: str, attempts: int):
+        try:
+            await self.firefly._async_send_request(
+                self._session,
+                method="POST",
+                endpoint="/api/v1/transactions",
+                data=json.loads(payload)
+            )
+        except Exception as e:
+            status = getattr(e, "status", None)
+            if status == 422 and attempts > 0 and "duplicate" in str(e).lower():
+                # 之前的某次尝试已经入账，只是没有收到响应
+                logger.info(f"交易 {outbox_id} 已存在于Firefly，视为发送成功")
+                self._mark_sent(outbox_id, day)
+                return
+            self.last_error = f"{type(e).__name__}: {e}"
+            if status is not None and 400 <= status < 500 and status != 429:
+                logger.error(f"交易 {outbox_id} 被Firefly拒绝，不再重试: {e}")
+                self._execute(
+                    "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts + 1, str(e), outbox_id)
+                )
+            else:
+                delay = min(self.max_backoff, self.base_backoff * (2 ** attempts))
+                logger.warning(f"交易 {outbox_id} 发送失败，{delay:.0f}秒后重试: {e}")
+                self._execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                    (attempts + 1, time.time() + delay, str(e), outbox_id)
+                )
+        else:
+            logger.info(f"交易 {outbox_id} 已发送到Firefly")
+            self._mark_sent(outbox_id, day)
+        finally:
+            self._in_flight_days.discard(day)
+            self._wakeup.set()
+
+    def request_refresh(self):
+        """让 flusher 尽快执行一次 refresh_hook"""
+        self._next_refresh = 0.0
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _refresh(self):
+        try:
+            await asyncio.to_thread(self.refresh_hook)
+        except Exception as e:
+            logger.warning(f"后台刷新失败: {e}")
+            # 失败后稍后重试，不必等完整的刷新间隔
+            self._next_refresh = time.monotonic() + min(self.refresh_interval, 30)
+        finally:
+            self._refresh_task = None
+
+    def _maybe_refresh(self):
+        """到期时启动后台刷新，同一时间只有一个刷新在进行"""
+        if self.refresh_hook is None or self._refresh_task is not None:
+            return
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        self._next_refresh = now + self.refresh_interval
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _run(self):
+        self._session = aiohttp.ClientSession()
+        try:
+            while True:
+                self._wakeup.clear()
+                self._maybe_refresh()
+                free = self.concurrency - len(self._in_flight_days)
+                if free > 0:
+                    for outbox_id, day, payload, attempts, _ in self._due_heads(free):
+                        self._in_flight_days.add(day)
+                        task = asyncio.create_task(self._send(outbox_id, day, payload, attempts))
+                        self._send_tasks.add(task)
+                        task.add_done_callback(self._send_tasks.discard)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # 等正在发送的请求结束后再关闭会话，结果会正常写回数据库
+            if self._send_tasks:
+                await asyncio.gather(*self._send_tasks, return_exceptions=True)
+            await self._session.close()
+
+    def start(self):
+        """
+        在当前事件循环中启动后台发送任务
+
+        多租户模式下租户可能在某个请求中按需创建，后台任务使用空的上下文启动，
+        避免继承该请求的追踪对象，把之后所有后台发送都记到这个已结束的请求上。
+        """
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def close(self):
+        """关闭数据库连接，调用前应先 stop"""
+        with self._db_lock:
+            self._conn.close()
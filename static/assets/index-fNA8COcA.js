@@ -60,7 +60,7 @@ const __vite__mapDeps=(i,m=__vite__mapDeps,d=(m.f||(m.f=["assets/RecentTransacti
 `)}getSetCookie(){return this.get("set-cookie")||[]}get[Symbol.toStringTag](){return"AxiosHeaders"}static from(t){return t instanceof this?t:new this(t)}static concat(t,...n){const o=new this(t);return n.forEach(a=>o.set(a)),o}static accessor(t){const o=(this[p4]=this[p4]={accessors:{}}).accessors,a=this.prototype;function r(l){const i=js(l);o[i]||(Aue(a,l),o[i]=!0)}return Re.isArray(t)?t.forEach(r):r(t),this}};so.accessor(["Content-Type","Content-Length","Accept","Accept-Encoding","User-Agent","Authorization"]);Re.reduceDescriptors(so.prototype,({value:e},t)=>{let n=t[0].toUpperCase()+t.slice(1);return{get:()=>e,set(o){this[n]=o}}});Re.freezeMethods(so);function r0(e,t){const n=this||wu,o=t||n,a=so.from(o.headers);let r=o.data;return Re.forEach(e,function(i){r=i.call(n,r,a.normalize(),t?t.status:void 0)}),a.normalize(),r}function qw(e){return!!(e&&e.__CANCEL__)}function Ps(e,t,n){Ot.call(this,e??"canceled",Ot.ERR_CANCELED,t,n),this.name="CanceledError"}Re.inherits(Ps,Ot,{__CANCEL__:!0});function Uw(e,t,n){const o=n.config.validateStatus;!n.status||!o||o(n.status)?e(n):t(new Ot("Request failed with status code "+n.status,[Ot.ERR_BAD_REQUEST,Ot.ERR_BAD_RESPONSE][Math.floor(n.status/100)-4],n.config,n.request,n))}function Nue(e){const t=/^([-+\w]{1,25})(:?\/\/|:)/.exec(e);return t&&t[1]||""}function Pue(e,t){e=e||10;const n=new Array(e),o=new Array(e);let a=0,r=0,l;return t=t!==void 0?t:1e3,function(u){const c=Date.now(),d=o[r];l||(l=c),n[a]=u,o[a]=c;let f=r,v=0;for(;f!==a;)v+=n[f++],f=f%e;if(a=(a+1)%e,a===r&&(r=(r+1)%e),c-l<t)return;const p=d&&c-d;return p?Math.round(v*1e3/p):void 0}}function Iue(e,t){let n=0,o=1e3/t,a,r;const l=(c,d=Date.now())=>{n=d,a=null,r&&(clearTimeout(r),r=null),e.apply(null,c)};return[(...c)=>{const d=Date.now(),f=d-n;f>=o?l(c,d):(a=c,r||(r=setTimeout(()=>{r=null,l(a)},o-f)))},()=>a&&l(a)]}const ud=(e,t,n=3)=>{let o=0;const a=Pue(50,250);return Iue(r=>{const l=r.loaded,i=r.lengthComputable?r.total:void 0,u=l-o,c=a(u),d=l<=i;o=l;const f={loaded:l,total:i,progress:i?l/i:void 0,bytes:u,rate:c||void 0,estimated:c&&i&&d?(i-l)/c:void 0,event:r,lengthComputable:i!=null,[t?"download":"upload"]:!0};e(f)},n)},v4=(e,t)=>{const n=e!=null;return[o=>t[0]({lengthComputable:n,total:e,loaded:o}),t[1]]},h4=e=>(...t)=>Re.asap(()=>e(...t)),Lue=zn.hasStandardBrowserEnv?((e,t)=>n=>(n=new URL(n,zn.origin),e.protocol===n.protocol&&e.host===n.host&&(t||e.port===n.port)))(new URL(zn.origin),zn.navigator&&/(msie|trident)/i.test(zn.navigator.userAgent)):()=>!0,Vue=zn.hasStandardBrowserEnv?{write(e,t,n,o,a,r){const l=[e+"="+encodeURIComponent(t)];Re.isNumber(n)&&l.push("expires="+new Date(n).toGMTString()),Re.isString(o)&&l.push("path="+o),Re.isString(a)&&l.push("domain="+a),r===!0&&l.push("secure"),document.cookie=l.join("; ")},read(e){const t=document.cookie.match(new RegExp("(^|;\\s*)("+e+")=([^;]*)"));return t?decodeURIComponent(t[3]):null},remove(e){this.write(e,"",Date.now()-864e5)}}:{write(){},read(){return null},remove(){}};function Bue(e){return/^([a-z][a-z\d+\-.]*:)?\/\//i.test(e)}function zue(e,t){return t?e.replace(/\/?\/$/,"")+"/"+t.replace(/^\/+/,""):e}function Yw(e,t,n){let o=!Bue(t);return e&&(o||n==!1)?zue(e,t):t}const m4=e=>e instanceof so?{...e}:e;function sl(e,t){t=t||{};const n={};function o(c,d,f,v){return Re.isPlainObject(c)&&Re.isPlainObject(d)?Re.merge.call({caseless:v},c,d):Re.isPlainObject(d)?Re.merge({},d):Re.isArray(d)?d.slice():d}function a(c,d,f,v){if(Re.isUndefined(d)){if(!Re.isUndefined(c))return o(void 0,c,f,v)}else return o(c,d,f,v)}function r(c,d){if(!Re.isUndefined(d))return o(void 0,d)}function l(c,d){if(Re.isUndefined(d)){if(!Re.isUndefined(c))return o(void 0,c)}else return o(void 0,d)}function i(c,d,f){if(f in t)return o(c,d);if(f in e)return o(void 0,c)}const u={url:r,method:r,data:r,baseURL:l,transformRequest:l,transformResponse:l,paramsSerializer:l,timeout:l,timeoutMessage:l,withCredentials:l,withXSRFToken:l,adapter:l,responseType:l,xsrfCookieName:l,xsrfHeaderName:l,onUploadProgress:l,onDownloadProgress:l,decompress:l,maxContentLength:l,maxBodyLength:l,beforeRedirect:l,transport:l,httpAgent:l,httpsAgent:l,cancelToken:l,socketPath:l,responseEncoding:l,validateStatus:i,headers:(c,d,f)=>a(m4(c),m4(d),f,!0)};return Re.forEach(Object.keys(Object.assign({},e,t)),function(d){const f=u[d]||a,v=f(e[d],t[d],d);Re.isUndefined(v)&&f!==i||(n[d]=v)}),n}const Gw=e=>{const t=sl({},e);let{data:n,withXSRFToken:o,xsrfHeaderName:a,xsrfCookieName:r,headers:l,auth:i}=t;t.headers=l=so.from(l),t.url=Kw(Yw(t.baseURL,t.url,t.allowAbsoluteUrls),e.params,e.paramsSerializer),i&&l.set("Authorization","Basic "+btoa((i.username||"")+":"+(i.password?unescape(encodeURIComponent(i.password)):"")));let u;if(Re.isFormData(n)){if(zn.hasStandardBrowserEnv||zn.hasStandardBrowserWebWorkerEnv)l.setContentType(void 0);else if((u=l.getContentType())!==!1){const[c,...d]=u?u.split(";").map(f=>f.trim()).filter(Boolean):[];l.setContentType([c||"multipart/form-data",...d].join("; "))}}if(zn.hasStandardBrowserEnv&&(o&&Re.isFunction(o)&&(o=o(t)),o||o!==!1&&Lue(t.url))){const c=a&&r&&Vue.read(r);c&&l.set(a,c)}return t},Hue=typeof XMLHttpRequest<"u",Due=Hue&&function(e){return new Promise(function(n,o){const a=Gw(e);let r=a.data;const l=so.from(a.headers).normalize();let{responseType:i,onUploadProgress:u,onDownloadProgress:c}=a,d,f,v,p,m;function h(){p&&p(),m&&m(),a.cancelToken&&a.cancelToken.unsubscribe(d),a.signal&&a.signal.removeEventListener("abort",d)}let g=new XMLHttpRequest;g.open(a.method.toUpperCase(),a.url,!0),g.timeout=a.timeout;function y(){if(!g)return;const _=so.from("getAllResponseHeaders"in g&&g.getAllResponseHeaders()),S={data:!i||i==="text"||i==="json"?g.responseText:g.response,status:g.status,statusText:g.statusText,headers:_,config:e,request:g};Uw(function(T){n(T),h()},function(T){o(T),h()},S),g=null}"onloadend"in g?g.onloadend=y:g.onreadystatechange=function(){!g||g.readyState!==4||g.status===0&&!(g.responseURL&&g.responseURL.indexOf("file:")===0)||setTimeout(y)},g.onabort=function(){g&&(o(new Ot("Request aborted",Ot.ECONNABORTED,e,g)),g=null)},g.onerror=function(){o(new Ot("Network Error",Ot.ERR_NETWORK,e,g)),g=null},g.ontimeout=function(){let w=a.timeout?"timeout of "+a.timeout+"ms exceeded":"timeout exceeded";const S=a.transitional||Ww;a.timeoutErrorMessage&&(w=a.timeoutErrorMessage),o(new Ot(w,S.clarifyTimeoutError?Ot.ETIMEDOUT:Ot.ECONNABORTED,e,g)),g=null},r===void 0&&l.setContentType(null),"setRequestHeader"in g&&Re.forEach(l.toJSON(),function(w,S){g.setRequestHeader(S,w)}),Re.isUndefined(a.withCredentials)||(g.withCredentials=!!a.withCredentials),i&&i!=="json"&&(g.responseType=a.responseType),c&&([v,m]=ud(c,!0),g.addEventListener("progress",v)),u&&g.upload&&([f,p]=ud(u),g.upload.addEventListener("progress",f),g.upload.addEventListener("loadend",p)),(a.cancelToken||a.signal)&&(d=_=>{g&&(o(!_||_.type?new Ps(null,e,g):_),g.abort(),g=null)},a.cancelToken&&a.cancelToken.subscribe(d),a.signal&&(a.signal.aborted?d():a.signal.addEventListener("abort",d)));const C=Nue(a.url);if(C&&zn.protocols.indexOf(C)===-1){o(new Ot("Unsupported protocol "+C+":",Ot.ERR_BAD_REQUEST,e));return}g.send(r||null)})},Fue=(e,t)=>{const{length:n}=e=e?e.filter(Boolean):[];if(t||n){let o=new AbortController,a;const r=function(c){if(!a){a=!0,i();const d=c instanceof Error?c:this.reason;o.abort(d instanceof Ot?d:new Ps(d instanceof Error?d.message:d))}};let l=t&&setTimeout(()=>{l=null,r(new Ot(`timeout ${t} of ms exceeded`,Ot.ETIMEDOUT))},t);const i=()=>{e&&(l&&clearTimeout(l),l=null,e.forEach(c=>{c.unsubscribe?c.unsubscribe(r):c.removeEventListener("abort",r)}),e=null)};e.forEach(c=>c.addEventListener("abort",r));const{signal:u}=o;return u.unsubscribe=()=>Re.asap(i),u}},Kue=function*(e,t){let n=e.byteLength;if(n<t){yield e;return}let o=0,a;for(;o<n;)a=o+t,yield e.slice(o,a),o=a},Wue=async function*(e,t){for await(const n of jue(e))yield*Kue(n,t)},jue=async function*(e){if(e[Symbol.asyncIterator]){yield*e;return}const t=e.getReader();try{for(;;){const{done:n,value:o}=await t.read();if(n)break;yield o}}finally{await t.cancel()}},g4=(e,t,n,o)=>{const a=Wue(e,t);let r=0,l,i=u=>{l||(l=!0,o&&o(u))};return new ReadableStream({async pull(u){try{const{done:c,value:d}=await a.next();if(c){i(),u.close();return}let f=d.byteLength;if(n){let v=r+=f;n(v)}u.enqueue(new Uint8Array(d))}catch(c){throw i(c),c}},cancel(u){return i(u),a.return()}},{highWaterMark:2})},sf=typeof fetch=="function"&&typeof Request=="function"&&typeof Response=="function",Xw=sf&&typeof ReadableStream=="function",que=sf&&(typeof TextEncoder=="function"?(e=>t=>e.encode(t))(new TextEncoder):async e=>new Uint8Array(await new Response(e).arrayBuffer())),Jw=(e,...t)=>{try{return!!e(...t)}catch{return!1}},Uue=Xw&&Jw(()=>{let e=!1;const t=new Request(zn.origin,{body:new ReadableStream,method:"POST",get duplex(){return e=!0,"half"}}).headers.has("Content-Type");return e&&!t}),y4=64*1024,zp=Xw&&Jw(()=>Re.isReadableStream(new Response("").body)),cd={stream:zp&&(e=>e.body)};sf&&(e=>{["text","arrayBuffer","blob","formData","stream"].forEach(t=>{!cd[t]&&(cd[t]=Re.isFunction(e[t])?n=>n[t]():(n,o)=>{throw new Ot(`Response type '${t}' is not supported`,Ot.ERR_NOT_SUPPORT,o)})})})(new Response);const Yue=async e=>{if(e==null)return 0;if(Re.isBlob(e))return e.size;if(Re.isSpecCompliantForm(e))return(await new Request(zn.origin,{method:"POST",body:e}).arrayBuffer()).byteLength;if(Re.isArrayBufferView(e)||Re.isArrayBuffer(e))return e.byteLength;if(Re.isURLSearchParams(e)&&(e=e+""),Re.isString(e))return(await que(e)).byteLength},Gue=async(e,t)=>{const n=Re.toFiniteNumber(e.getContentLength());return n??Yue(t)},Xue=sf&&(async e=>{let{url:t,method:n,data:o,signal:a,cancelToken:r,timeout:l,onDownloadProgress:i,onUploadProgress:u,responseType:c,headers:d,withCredentials:f="same-origin",fetchOptions:v}=Gw(e);c=c?(c+"").toLowerCase():"text";let p=Fue([a,r&&r.toAbortSignal()],l),m;const h=p&&p.unsubscribe&&(()=>{p.unsubscribe()});let g;try{if(u&&Uue&&n!=="get"&&n!=="head"&&(g=await Gue(d,o))!==0){let S=new Request(t,{method:"POST",body:o,duplex:"half"}),E;if(Re.isFormData(o)&&(E=S.headers.get("content-type"))&&d.setContentType(E),S.body){const[T,O]=v4(g,ud(h4(u)));o=g4(S.body,y4,T,O)}}Re.isString(f)||(f=f?"include":"omit");const y="credentials"in Request.prototype;m=new Request(t,{...v,signal:p,method:n.toUpperCase(),headers:d.normalize().toJSON(),body:o,duplex:"half",credentials:y?f:void 0});let C=await fetch(m,v);const _=zp&&(c==="stream"||c==="response");if(zp&&(i||_&&h)){const S={};["status","statusText","headers"].forEach(N=>{S[N]=C[N]});const E=Re.toFiniteNumber(C.headers.get("content-length")),[T,O]=i&&v4(E,ud(h4(i),!0))||[];C=new Response(g4(C.body,y4,T,()=>{O&&O(),h&&h()}),S)}c=c||"text";let w=await cd[Re.findKey(cd,c)||"text"](C,e);return!_&&h&&h(),await new Promise((S,E)=>{Uw(S,E,{data:w,headers:so.from(C.headers),status:C.status,statusText:C.statusText,config:e,request:m})})}catch(y){throw h&&h(),y&&y.name==="TypeError"&&/Load failed|fetch/i.test(y.message)?Object.assign(new Ot("Network Error",Ot.ERR_NETWORK,e,m),{cause:y.cause||y}):Ot.from(y,y&&y.code,e,m)}}),Hp={http:due,xhr:Due,fetch:Xue};Re.forEach(Hp,(e,t)=>{if(e){try{Object.defineProperty(e,"name",{value:t})}catch{}Object.defineProperty(e,"adapterName",{value:t})}});const _4=e=>`- ${e}`,Jue=e=>Re.isFunction(e)||e===null||e===!1,Zw={getAdapter:e=>{e=Re.isArray(e)?e:[e];const{length:t}=e;let n,o;const a={};for(let r=0;r<t;r++){n=e[r];let l;if(o=n,!Jue(n)&&(o=Hp[(l=String(n)).toLowerCase()],o===void 0))throw new Ot(`Unknown adapter '${l}'`);if(o)break;a[l||"#"+r]=o}if(!o){const r=Object.entries(a).map(([i,u])=>`adapter ${i} `+(u===!1?"is not supported by the environment":"is not available in the build"));let l=t?r.length>1?`since :
 `+r.map(_4).join(`
 `):" "+_4(r[0]):"as no adapter specified";throw new Ot("There is no suitable adapter to dispatch the request "+l,"ERR_NOT_SUPPORT")}return o},adapters:Hp};function l0(e){if(e.cancelToken&&e.cancelToken.throwIfRequested(),e.signal&&e.signal.aborted)throw new Ps(null,e)}function b4(e){return l0(e),e.headers=so.from(e.headers),e.data=r0.call(e,e.transformRequest),["post","put","patch"].indexOf(e.method)!==-1&&e.headers.setContentType("application/x-www-form-urlencoded",!1),Zw.getAdapter(e.adapter||wu.adapter)(e).then(function(o){return l0(e),o.data=r0.call(e,e.transformResponse,o),o.headers=so.from(o.headers),o},function(o){return qw(o)||(l0(e),o&&o.response&&(o.response.data=r0.call(e,e.transformResponse,o.response),o.response.headers=so.from(o.response.headers))),Promise.reject(o)})}const Qw="1.10.0",uf={};["object","boolean","number","function","string","symbol"].forEach((e,t)=>{uf[e]=function(o){return typeof o===e||"a"+(t<1?"n ":" ")+e}});const w4={};uf.transitional=function(t,n,o){function a(r,l){return"[Axios v"+Qw+"] Transitional option '"+r+"'"+l+(o?". "+o:"")}return(r,l,i)=>{if(t===!1)throw new Ot(a(l," has been removed"+(n?" in "+n:"")),Ot.ERR_DEPRECATED);return n&&!w4[l]&&(w4[l]=!0,console.warn(a(l," has been deprecated since v"+n+" and will be removed in the near future"))),t?t(r,l,i):!0}};uf.spelling=function(t){return(n,o)=>(console.warn(`${o} is likely a misspelling of ${t}`),!0)};function Zue(e,t,n){if(typeof e!="object")throw new Ot("options must be an object",Ot.ERR_BAD_OPTION_VALUE);const o=Object.keys(e);let a=o.length;for(;a-- >0;){const r=o[a],l=t[r];if(l){const i=e[r],u=i===void 0||l(i,r,e);if(u!==!0)throw new Ot("option "+r+" must be "+u,Ot.ERR_BAD_OPTION_VALUE);continue}if(n!==!0)throw new Ot("Unknown option "+r,Ot.ERR_BAD_OPTION)}}const Sc={assertOptions:Zue,validators:uf},na=Sc.validators;let Jr=class{constructor(t){this.defaults=t||{},this.interceptors={request:new f4,response:new f4}}async request(t,n){try{return await this._request(t,n)}catch(o){if(o instanceof Error){let a={};Error.captureStackTrace?Error.captureStackTrace(a):a=new Error;const r=a.stack?a.stack.replace(/^.+\n/,""):"";try{o.stack?r&&!String(o.stack).endsWith(r.replace(/^.+\n.+\n/,""))&&(o.stack+=`
-`+r):o.stack=r}catch{}}throw o}}_request(t,n){typeof t=="string"?(n=n||{},n.url=t):n=t||{},n=sl(this.defaults,n);const{transitional:o,paramsSerializer:a,headers:r}=n;o!==void 0&&Sc.assertOptions(o,{silentJSONParsing:na.transitional(na.boolean),forcedJSONParsing:na.transitional(na.boolean),clarifyTimeoutError:na.transitional(na.boolean)},!1),a!=null&&(Re.isFunction(a)?n.paramsSerializer={serialize:a}:Sc.assertOptions(a,{encode:na.function,serialize:na.function},!0)),n.allowAbsoluteUrls!==void 0||(this.defaults.allowAbsoluteUrls!==void 0?n.allowAbsoluteUrls=this.defaults.allowAbsoluteUrls:n.allowAbsoluteUrls=!0),Sc.assertOptions(n,{baseUrl:na.spelling("baseURL"),withXsrfToken:na.spelling("withXSRFToken")},!0),n.method=(n.method||this.defaults.method||"get").toLowerCase();let l=r&&Re.merge(r.common,r[n.method]);r&&Re.forEach(["delete","get","head","post","put","patch","common"],m=>{delete r[m]}),n.headers=so.concat(l,r);const i=[];let u=!0;this.interceptors.request.forEach(function(h){typeof h.runWhen=="function"&&h.runWhen(n)===!1||(u=u&&h.synchronous,i.unshift(h.fulfilled,h.rejected))});const c=[];this.interceptors.response.forEach(function(h){c.push(h.fulfilled,h.rejected)});let d,f=0,v;if(!u){const m=[b4.bind(this),void 0];for(m.unshift.apply(m,i),m.push.apply(m,c),v=m.length,d=Promise.resolve(n);f<v;)d=d.then(m[f++],m[f++]);return d}v=i.length;let p=n;for(f=0;f<v;){const m=i[f++],h=i[f++];try{p=m(p)}catch(g){h.call(this,g);break}}try{d=b4.call(this,p)}catch(m){return Promise.reject(m)}for(f=0,v=c.length;f<v;)d=d.then(c[f++],c[f++]);return d}getUri(t){t=sl(this.defaults,t);const n=Yw(t.baseURL,t.url,t.allowAbsoluteUrls);return Kw(n,t.params,t.paramsSerializer)}};Re.forEach(["delete","get","head","options"],function(t){Jr.prototype[t]=function(n,o){return this.request(sl(o||{},{method:t,url:n,data:(o||{}).data}))}});Re.forEach(["post","put","patch"],function(t){function n(o){return function(r,l,i){return this.request(sl(i||{},{method:t,headers:o?{"Content-Type":"multipart/form-data"}:{},url:r,data:l}))}}Jr.prototype[t]=n(),Jr.prototype[t+"Form"]=n(!0)});let Que=class e5{constructor(t){if(typeof t!="function")throw new TypeError("executor must be a function.");let n;this.promise=new Promise(function(r){n=r});const o=this;this.promise.then(a=>{if(!o._listeners)return;let r=o._listeners.length;for(;r-- >0;)o._listeners[r](a);o._listeners=null}),this.promise.then=a=>{let r;const l=new Promise(i=>{o.subscribe(i),r=i}).then(a);return l.cancel=function(){o.unsubscribe(r)},l},t(function(r,l,i){o.reason||(o.reason=new Ps(r,l,i),n(o.reason))})}throwIfRequested(){if(this.reason)throw this.reason}subscribe(t){if(this.reason){t(this.reason);return}this._listeners?this._listeners.push(t):this._listeners=[t]}unsubscribe(t){if(!this._listeners)return;const n=this._listeners.indexOf(t);n!==-1&&this._listeners.splice(n,1)}toAbortSignal(){const t=new AbortController,n=o=>{t.abort(o)};return this.subscribe(n),t.signal.unsubscribe=()=>this.unsubscribe(n),t.signal}static source(){let t;return{token:new e5(function(a){t=a}),cancel:t}}};function ece(e){return function(n){return e.apply(null,n)}}function tce(e){return Re.isObject(e)&&e.isAxiosError===!0}const Dp={Continue:100,SwitchingProtocols:101,Processing:102,EarlyHints:103,Ok:200,Created:201,Accepted:202,NonAuthoritativeInformation:203,NoContent:204,ResetContent:205,PartialContent:206,MultiStatus:207,AlreadyReported:208,ImUsed:226,MultipleChoices:300,MovedPermanently:301,Found:302,SeeOther:303,NotModified:304,UseProxy:305,Unused:306,TemporaryRedirect:307,PermanentRedirect:308,BadRequest:400,Unauthorized:401,PaymentRequired:402,Forbidden:403,NotFound:404,MethodNotAllowed:405,NotAcceptable:406,ProxyAuthenticationRequired:407,RequestTimeout:408,Conflict:409,Gone:410,LengthRequired:411,PreconditionFailed:412,PayloadTooLarge:413,UriTooLong:414,UnsupportedMediaType:415,RangeNotSatisfiable:416,ExpectationFailed:417,ImATeapot:418,MisdirectedRequest:421,UnprocessableEntity:422,Locked:423,FailedDependency:424,TooEarly:425,UpgradeRequired:426,PreconditionRequired:428,TooManyRequests:429,RequestHeaderFieldsTooLarge:431,UnavailableForLegalReasons:451,InternalServerError:500,NotImplemented:501,BadGateway:502,ServiceUnavailable:503,GatewayTimeout:504,HttpVersionNotSupported:505,VariantAlsoNegotiates:506,InsufficientStorage:507,LoopDetected:508,NotExtended:510,NetworkAuthenticationRequired:511};Object.entries(Dp).forEach(([e,t])=>{Dp[t]=e});function t5(e){const t=new Jr(e),n=Rw(Jr.prototype.request,t);return Re.extend(n,Jr.prototype,t,{allOwnKeys:!0}),Re.extend(n,t,null,{allOwnKeys:!0}),n.create=function(a){return t5(sl(e,a))},n}const vn=t5(wu);vn.Axios=Jr;vn.CanceledError=Ps;vn.CancelToken=Que;vn.isCancel=qw;vn.VERSION=Qw;vn.toFormData=lf;vn.AxiosError=Ot;vn.Cancel=vn.CanceledError;vn.all=function(t){return Promise.all(t)};vn.spread=ece;vn.isAxiosError=tce;vn.mergeConfig=sl;vn.AxiosHeaders=so;vn.formToJSON=e=>jw(Re.isHTMLForm(e)?new FormData(e):e);vn.getAdapter=Zw.getAdapter;vn.HttpStatusCode=Dp;vn.default=vn;const{Axios:hce,AxiosError:mce,CanceledError:gce,isCancel:yce,CancelToken:_ce,VERSION:bce,all:wce,Cancel:Cce,isAxiosError:Sce,spread:kce,toFormData:Ece,AxiosHeaders:xce,HttpStatusCode:Tce,formToJSON:Mce,getAdapter:$ce,mergeConfig:Oce}=vn,kl=vn.create({baseURL:"/api",timeout:1e5}),El={parseTransactions(e){return kl.post("/parse",e,{headers:{"Content-Type":"text/plain"}}).then(t=>t.data)},recordTransactions(e){return kl.post("/record",e)},getTransactions(){return kl.get("/transactions").then(e=>e.data)},getAccounts(){return kl.get("/accounts").then(e=>e.data)},getDefaultAccount(){return kl.get("/default_account").then(e=>e.data)},updateDefaultAccount(e){return kl.post("/default",e)}},nce=(e,t)=>{const n=e.__vccOpts||e;for(const[o,a]of t)n[o]=a;return n},oce={class:"button-container"},ace={key:1},rce={style:{"text-align":"right"}},lce={__name:"HomeView",setup(e){const t=B(""),n=B([]),o=B(""),a=B(""),r=B(""),l=B(""),i=B(!1),u=B(!1);pe(o,T=>{T&&p("expense",T)}),pe(a,T=>{T&&p("revenue",T)}),pe(t,async T=>{if(T.trim())try{await El.updateDefaultAccount({last_transaction_text:T,last_edit:new Date().toISOString()})}catch(O){console.error("保存交易记录失败:",O)}},{deep:!0});const c=k(()=>n.value.filter(T=>T.type==="revenue"||T.type==="asset"||T.type==="cash")),d=k(()=>n.value.filter(T=>T.type==="expense"||T.type==="asset"||T.type==="cash")),f=async()=>{try{const[T,O]=await Promise.all([El.getAccounts(),El.getDefaultAccount()]),N=Object.entries(T).map(([$,L])=>({id:$,...L})).sort(($,L)=>$.name.localeCompare(L.name));n.value=N,localStorage.setItem("accounts",JSON.stringify(N)),o.value=O.default_expense||"",a.value=O.default_revenue||"",O.last_transaction_text&&(t.value=O.last_transaction_text),r.value=O.version||"",l.value=O.firefly_iii_url||""}catch(T){sr.error("加载账户失败"),console.error(T)}},v=()=>{l.value&&window.open(l.value,"_blank")},p=async(T,O)=>{try{await El.updateDefaultAccount({[`default_${T}`]:O,last_edit:new Date().toISOString()})}catch{sr.error("保存默认账户失败")}};at(()=>{f()});const m=B(!1),h=B(!1),g=B(!1),y=B([]),C=B(""),_=async()=>{if(!t.value.trim()){sr.warning("请输入交易记录内容");return}try{m.value=!0;const T=await El.parseTransactions(t.value);y.value=T.transactions||[],C.value=T.think_result||"AI未返回思考结果",h.value=!0}catch(T){sr.error(`解析交易记录时出错: ${T.message}`)}finally{m.value=!1}},w=()=>{if(y.value.length===0){sr.warning("没有交易记录可提交");return}g.value=!0},S=async()=>{if(!i.value)try{i.value=!0,await El.recordTransactions(y.value),sr.success("交易记录成功"),E(),g.value=!1}catch(T){sr.error(`记录交易时出错: ${T.message}`)}finally{i.value=!1}},E=()=>{t.value="",h.value=!1,y.value=[],C.value=""};return(T,O)=>{const N=_t("QuestionFilled"),$=_t("el-tooltip"),L=_t("el-link"),P=Ji("loading");return b(),ie(s(tp),{justify:"center",style:{"min-height":"100vh",background:"linear-gradient(135deg,#f5f8ff 0%,#e8edf7 100%)",padding:"32px 0"}},{default:Y(()=>[j(s(nc),{xs:24,sm:20,md:16,lg:14,xl:12},{default:Y(()=>[j(s($l),{class:"firefly-header",shadow:"always"},{default:Y(()=>O[6]||(O[6]=[x("h1",null,"Firefly AI 记账系统",-1)])),_:1,__:[6]}),j(s(tp),{gutter:20,style:{"margin-bottom":"24px"}},{default:Y(()=>[j(s(nc),{xs:24,sm:12},{default:Y(()=>[j(s($l),{shadow:"hover",class:"firefly-account-card"},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(B8))]),_:1}),O[7]||(O[7]=x("span",null," 支出来源账户 ",-1))]),default:Y(()=>[j(s(J0),{"label-position":"top"},{default:Y(()=>[j(s(Z0),null,{default:Y(()=>[n.value.length===0?(b(),ie(s(up),{key:0,rows:3,animated:""})):(b(),ie(s(B0),{key:1,modelValue:o.value,"onUpdate:modelValue":O[0]||(O[0]=F=>o.value=F)},{default:Y(()=>[(b(!0),M(He,null,ht(c.value,F=>(b(),ie(s(Dc),{key:F.id,value:F.id,border:"",class:"firefly-account-radio"},{default:Y(()=>[x("span",null,ke(F.name),1),j(s(sa),{type:F.current_balance>=0?"success":"danger",size:"small"},{default:Y(()=>[Je(ke(F.current_balance),1)]),_:2},1032,["type"])]),_:2},1032,["value"]))),128))]),_:1},8,["modelValue"]))]),_:1})]),_:1})]),_:1})]),_:1}),j(s(nc),{xs:24,sm:12},{default:Y(()=>[j(s($l),{shadow:"hover",class:"firefly-account-card"},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(w8))]),_:1}),O[8]||(O[8]=x("span",null," 支出目的账户",-1))]),default:Y(()=>[j(s(J0),{"label-position":"top"},{default:Y(()=>[j(s(Z0),null,{default:Y(()=>[n.value.length===0?(b(),ie(s(up),{key:0,rows:3,animated:""})):(b(),ie(s(B0),{key:1,modelValue:a.value,"onUpdate:modelValue":O[1]||(O[1]=F=>a.value=F)},{default:Y(()=>[(b(!0),M(He,null,ht(d.value,F=>(b(),ie(s(Dc),{key:F.id,value:F.id,border:"",class:"firefly-account-radio"},{default:Y(()=>[x("span",null,ke(F.name),1),j(s(sa),{type:F.current_balance>=0?"success":"danger",size:"small"},{default:Y(()=>[Je(ke(F.current_balance),1)]),_:2},1032,["type"])]),_:2},1032,["value"]))),128))]),_:1},8,["modelValue"]))]),_:1})]),_:1})]),_:1})]),_:1})]),_:1}),j(s($l),{class:"firefly-input-card",shadow:"hover",style:{"margin-bottom":"28px"}},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(S8))]),_:1}),O[10]||(O[10]=x("span",null," 输入交易记录",-1)),j($,{effect:"light",placement:"top"},{content:Y(()=>O[9]||(O[9]=[x("div",{style:{"max-width":"300px","line-height":"1.6"}},[Je(" 输入格式示例："),x("br"),Je(" 日期（如：07.06）"),x("br"),Je(" 每行一条交易，以“-”开头，后跟金额,标题(备注信息)和花费时间（如果没写ai会随机生成时间），例如："),x("br"),Je(" 7.6"),x("br"),Je(" - 66 午餐 12:00 "),x("br"),Je(" - 900 物业费(最近一季度) 16:00"),x("br"),Je(" 7.7"),x("br"),Je(" - 10.30 购物 150"),x("br")],-1)])),default:Y(()=>[j(s(Ie),{style:{"margin-left":"8px",cursor:"pointer"}},{default:Y(()=>[j(N)]),_:1})]),_:1})]),default:Y(()=>[j(s(Tn),{type:"textarea",modelValue:t.value,"onUpdate:modelValue":O[2]||(O[2]=F=>t.value=F),rows:7,placeholder:`输入交易记录，格式如：
+`+r):o.stack=r}catch{}}throw o}}_request(t,n){typeof t=="string"?(n=n||{},n.url=t):n=t||{},n=sl(this.defaults,n);const{transitional:o,paramsSerializer:a,headers:r}=n;o!==void 0&&Sc.assertOptions(o,{silentJSONParsing:na.transitional(na.boolean),forcedJSONParsing:na.transitional(na.boolean),clarifyTimeoutError:na.transitional(na.boolean)},!1),a!=null&&(Re.isFunction(a)?n.paramsSerializer={serialize:a}:Sc.assertOptions(a,{encode:na.function,serialize:na.function},!0)),n.allowAbsoluteUrls!==void 0||(this.defaults.allowAbsoluteUrls!==void 0?n.allowAbsoluteUrls=this.defaults.allowAbsoluteUrls:n.allowAbsoluteUrls=!0),Sc.assertOptions(n,{baseUrl:na.spelling("baseURL"),withXsrfToken:na.spelling("withXSRFToken")},!0),n.method=(n.method||this.defaults.method||"get").toLowerCase();let l=r&&Re.merge(r.common,r[n.method]);r&&Re.forEach(["delete","get","head","post","put","patch","common"],m=>{delete r[m]}),n.headers=so.concat(l,r);const i=[];let u=!0;this.interceptors.request.forEach(function(h){typeof h.runWhen=="function"&&h.runWhen(n)===!1||(u=u&&h.synchronous,i.unshift(h.fulfilled,h.rejected))});const c=[];this.interceptors.response.forEach(function(h){c.push(h.fulfilled,h.rejected)});let d,f=0,v;if(!u){const m=[b4.bind(this),void 0];for(m.unshift.apply(m,i),m.push.apply(m,c),v=m.length,d=Promise.resolve(n);f<v;)d=d.then(m[f++],m[f++]);return d}v=i.length;let p=n;for(f=0;f<v;){const m=i[f++],h=i[f++];try{p=m(p)}catch(g){h.call(this,g);break}}try{d=b4.call(this,p)}catch(m){return Promise.reject(m)}for(f=0,v=c.length;f<v;)d=d.then(c[f++],c[f++]);return d}getUri(t){t=sl(this.defaults,t);const n=Yw(t.baseURL,t.url,t.allowAbsoluteUrls);return Kw(n,t.params,t.paramsSerializer)}};Re.forEach(["delete","get","head","options"],function(t){Jr.prototype[t]=function(n,o){return this.request(sl(o||{},{method:t,url:n,data:(o||{}).data}))}});Re.forEach(["post","put","patch"],function(t){function n(o){return function(r,l,i){return this.request(sl(i||{},{method:t,headers:o?{"Content-Type":"multipart/form-data"}:{},url:r,data:l}))}}Jr.prototype[t]=n(),Jr.prototype[t+"Form"]=n(!0)});let Que=class e5{constructor(t){if(typeof t!="function")throw new TypeError("executor must be a function.");let n;this.promise=new Promise(function(r){n=r});const o=this;this.promise.then(a=>{if(!o._listeners)return;let r=o._listeners.length;for(;r-- >0;)o._listeners[r](a);o._listeners=null}),this.promise.then=a=>{let r;const l=new Promise(i=>{o.subscribe(i),r=i}).then(a);return l.cancel=function(){o.unsubscribe(r)},l},t(function(r,l,i){o.reason||(o.reason=new Ps(r,l,i),n(o.reason))})}throwIfRequested(){if(this.reason)throw this.reason}subscribe(t){if(this.reason){t(this.reason);return}this._listeners?this._listeners.push(t):this._listeners=[t]}unsubscribe(t){if(!this._listeners)return;const n=this._listeners.indexOf(t);n!==-1&&this._listeners.splice(n,1)}toAbortSignal(){const t=new AbortController,n=o=>{t.abort(o)};return this.subscribe(n),t.signal.unsubscribe=()=>this.unsubscribe(n),t.signal}static source(){let t;return{token:new e5(function(a){t=a}),cancel:t}}};function ece(e){return function(n){return e.apply(null,n)}}function tce(e){return Re.isObject(e)&&e.isAxiosError===!0}const Dp={Continue:100,SwitchingProtocols:101,Processing:102,EarlyHints:103,Ok:200,Created:201,Accepted:202,NonAuthoritativeInformation:203,NoContent:204,ResetContent:205,PartialContent:206,MultiStatus:207,AlreadyReported:208,ImUsed:226,MultipleChoices:300,MovedPermanently:301,Found:302,SeeOther:303,NotModified:304,UseProxy:305,Unused:306,TemporaryRedirect:307,PermanentRedirect:308,BadRequest:400,Unauthorized:401,PaymentRequired:402,Forbidden:403,NotFound:404,MethodNotAllowed:405,NotAcceptable:406,ProxyAuthenticationRequired:407,RequestTimeout:408,Conflict:409,Gone:410,LengthRequired:411,PreconditionFailed:412,PayloadTooLarge:413,UriTooLong:414,UnsupportedMediaType:415,RangeNotSatisfiable:416,ExpectationFailed:417,ImATeapot:418,MisdirectedRequest:421,UnprocessableEntity:422,Locked:423,FailedDependency:424,TooEarly:425,UpgradeRequired:426,PreconditionRequired:428,TooManyRequests:429,RequestHeaderFieldsTooLarge:431,UnavailableForLegalReasons:451,InternalServerError:500,NotImplemented:501,BadGateway:502,ServiceUnavailable:503,GatewayTimeout:504,HttpVersionNotSupported:505,VariantAlsoNegotiates:506,InsufficientStorage:507,LoopDetected:508,NotExtended:510,NetworkAuthenticationRequired:511};Object.entries(Dp).forEach(([e,t])=>{Dp[t]=e});function t5(e){const t=new Jr(e),n=Rw(Jr.prototype.request,t);return Re.extend(n,Jr.prototype,t,{allOwnKeys:!0}),Re.extend(n,t,null,{allOwnKeys:!0}),n.create=function(a){return t5(sl(e,a))},n}const vn=t5(wu);vn.Axios=Jr;vn.CanceledError=Ps;vn.CancelToken=Que;vn.isCancel=qw;vn.VERSION=Qw;vn.toFormData=lf;vn.AxiosError=Ot;vn.Cancel=vn.CanceledError;vn.all=function(t){return Promise.all(t)};vn.spread=ece;vn.isAxiosError=tce;vn.mergeConfig=sl;vn.AxiosHeaders=so;vn.formToJSON=e=>jw(Re.isHTMLForm(e)?new FormData(e):e);vn.getAdapter=Zw.getAdapter;vn.HttpStatusCode=Dp;vn.default=vn;const{Axios:hce,AxiosError:mce,CanceledError:gce,isCancel:yce,CancelToken:_ce,VERSION:bce,all:wce,Cancel:Cce,isAxiosError:Sce,spread:kce,toFormData:Ece,AxiosHeaders:xce,HttpStatusCode:Tce,formToJSON:Mce,getAdapter:$ce,mergeConfig:Oce}=vn,kl=vn.create({baseURL:"/api",timeout:1e5}),Gtk="tenantKey",Gti=(kl.interceptors.request.use(e=>{const t=localStorage.getItem(Gtk);return t&&(e.headers["X-Tenant-Key"]=t),e}),kl.interceptors.response.use(null,e=>{var a,r,l;const t=e.config;if(((a=e.response)==null?void 0:a.status)!==401||!t||t._tenantKeyRetried)return Promise.reject(e);const n=(r=t.headers)==null?void 0:r["X-Tenant-Key"];let o=localStorage.getItem(Gtk);if(!o||o===n){if(o=(l=window.prompt("请输入租户密钥",""))==null?void 0:l.trim(),!o)return Promise.reject(e);localStorage.setItem(Gtk,o)}return t._tenantKeyRetried=!0,kl(t)}),0),El={parseTransactions(e){return kl.post("/parse",e,{headers:{"Content-Type":"text/plain"}}).then(t=>t.data)},recordTransactions(e){return kl.post("/record",e)},getTransactions(){return kl.get("/transactions").then(e=>e.data)},getAccounts(){return kl.get("/accounts").then(e=>e.data)},getDefaultAccount(){return kl.get("/default_account").then(e=>e.data)},updateDefaultAccount(e){return kl.post("/default",e)}},nce=(e,t)=>{const n=e.__vccOpts||e;for(const[o,a]of t)n[o]=a;return n},oce={class:"button-container"},ace={key:1},rce={style:{"text-align":"right"}},lce={__name:"HomeView",setup(e){const t=B(""),n=B([]),o=B(""),a=B(""),r=B(""),l=B(""),i=B(!1),u=B(!1);pe(o,T=>{T&&p("expense",T)}),pe(a,T=>{T&&p("revenue",T)}),pe(t,async T=>{if(T.trim())try{await El.updateDefaultAccount({last_transaction_text:T,last_edit:new Date().toISOString()})}catch(O){console.error("保存交易记录失败:",O)}},{deep:!0});const c=k(()=>n.value.filter(T=>T.type==="revenue"||T.type==="asset"||T.type==="cash")),d=k(()=>n.value.filter(T=>T.type==="expense"||T.type==="asset"||T.type==="cash")),f=async()=>{try{const[T,O]=await Promise.all([El.getAccounts(),El.getDefaultAccount()]),N=Object.entries(T).map(([$,L])=>({id:$,...L})).sort(($,L)=>$.name.localeCompare(L.name));n.value=N,localStorage.setItem("accounts",JSON.stringify(N)),o.value=O.default_expense||"",a.value=O.default_revenue||"",O.last_transaction_text&&(t.value=O.last_transaction_text),r.value=O.version||"",l.value=O.firefly_iii_url||""}catch(T){sr.error("加载账户失败"),console.error(T)}},v=()=>{l.value&&window.open(l.value,"_blank")},p=async(T,O)=>{try{await El.updateDefaultAccount({[`default_${T}`]:O,last_edit:new Date().toISOString()})}catch{sr.error("保存默认账户失败")}};at(()=>{f()});const m=B(!1),h=B(!1),g=B(!1),y=B([]),C=B(""),_=async()=>{if(!t.value.trim()){sr.warning("请输入交易记录内容");return}try{m.value=!0;const T=await El.parseTransactions(t.value);y.value=T.transactions||[],C.value=T.think_result||"AI未返回思考结果",h.value=!0}catch(T){sr.error(`解析交易记录时出错: ${T.message}`)}finally{m.value=!1}},w=()=>{if(y.value.length===0){sr.warning("没有交易记录可提交");return}g.value=!0},S=async()=>{if(!i.value)try{i.value=!0,await El.recordTransactions(y.value),sr.success("交易记录成功"),E(),g.value=!1}catch(T){sr.error(`记录交易时出错: ${T.message}`)}finally{i.value=!1}},E=()=>{t.value="",h.value=!1,y.value=[],C.value=""};return(T,O)=>{const N=_t("QuestionFilled"),$=_t("el-tooltip"),L=_t("el-link"),P=Ji("loading");return b(),ie(s(tp),{justify:"center",style:{"min-height":"100vh",background:"linear-gradient(135deg,#f5f8ff 0%,#e8edf7 100%)",padding:"32px 0"}},{default:Y(()=>[j(s(nc),{xs:24,sm:20,md:16,lg:14,xl:12},{default:Y(()=>[j(s($l),{class:"firefly-header",shadow:"always"},{default:Y(()=>O[6]||(O[6]=[x("h1",null,"Firefly AI 记账系统",-1)])),_:1,__:[6]}),j(s(tp),{gutter:20,style:{"margin-bottom":"24px"}},{default:Y(()=>[j(s(nc),{xs:24,sm:12},{default:Y(()=>[j(s($l),{shadow:"hover",class:"firefly-account-card"},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(B8))]),_:1}),O[7]||(O[7]=x("span",null," 支出来源账户 ",-1))]),default:Y(()=>[j(s(J0),{"label-position":"top"},{default:Y(()=>[j(s(Z0),null,{default:Y(()=>[n.value.length===0?(b(),ie(s(up),{key:0,rows:3,animated:""})):(b(),ie(s(B0),{key:1,modelValue:o.value,"onUpdate:modelValue":O[0]||(O[0]=F=>o.value=F)},{default:Y(()=>[(b(!0),M(He,null,ht(c.value,F=>(b(),ie(s(Dc),{key:F.id,value:F.id,border:"",class:"firefly-account-radio"},{default:Y(()=>[x("span",null,ke(F.name),1),j(s(sa),{type:F.current_balance>=0?"success":"danger",size:"small"},{default:Y(()=>[Je(ke(F.current_balance),1)]),_:2},1032,["type"])]),_:2},1032,["value"]))),128))]),_:1},8,["modelValue"]))]),_:1})]),_:1})]),_:1})]),_:1}),j(s(nc),{xs:24,sm:12},{default:Y(()=>[j(s($l),{shadow:"hover",class:"firefly-account-card"},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(w8))]),_:1}),O[8]||(O[8]=x("span",null," 支出目的账户",-1))]),default:Y(()=>[j(s(J0),{"label-position":"top"},{default:Y(()=>[j(s(Z0),null,{default:Y(()=>[n.value.length===0?(b(),ie(s(up),{key:0,rows:3,animated:""})):(b(),ie(s(B0),{key:1,modelValue:a.value,"onUpdate:modelValue":O[1]||(O[1]=F=>a.value=F)},{default:Y(()=>[(b(!0),M(He,null,ht(d.value,F=>(b(),ie(s(Dc),{key:F.id,value:F.id,border:"",class:"firefly-account-radio"},{default:Y(()=>[x("span",null,ke(F.name),1),j(s(sa),{type:F.current_balance>=0?"success":"danger",size:"small"},{default:Y(()=>[Je(ke(F.current_balance),1)]),_:2},1032,["type"])]),_:2},1032,["value"]))),128))]),_:1},8,["modelValue"]))]),_:1})]),_:1})]),_:1})]),_:1})]),_:1}),j(s($l),{class:"firefly-input-card",shadow:"hover",style:{"margin-bottom":"28px"}},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(S8))]),_:1}),O[10]||(O[10]=x("span",null," 输入交易记录",-1)),j($,{effect:"light",placement:"top"},{content:Y(()=>O[9]||(O[9]=[x("div",{style:{"max-width":"300px","line-height":"1.6"}},[Je(" 输入格式示例："),x("br"),Je(" 日期（如：07.06）"),x("br"),Je(" 每行一条交易，以“-”开头，后跟金额,标题(备注信息)和花费时间（如果没写ai会随机生成时间），例如："),x("br"),Je(" 7.6"),x("br"),Je(" - 66 午餐 12:00 "),x("br"),Je(" - 900 物业费(最近一季度) 16:00"),x("br"),Je(" 7.7"),x("br"),Je(" - 10.30 购物 150"),x("br")],-1)])),default:Y(()=>[j(s(Ie),{style:{"margin-left":"8px",cursor:"pointer"}},{default:Y(()=>[j(N)]),_:1})]),_:1})]),default:Y(()=>[j(s(Tn),{type:"textarea",modelValue:t.value,"onUpdate:modelValue":O[2]||(O[2]=F=>t.value=F),rows:7,placeholder:`输入交易记录，格式如：
 07.06
 - 12.00 午餐 66
 - 16.00 物业费 900`,resize:"none",class:"firefly-transaction-input"},null,8,["modelValue"]),x("div",oce,[j(L,{type:"info"},{default:Y(()=>[Je("Version: "+ke(r.value),1)]),_:1}),l.value?(b(),ie(s(Qt),{key:0,type:"info",icon:"Link",onClick:v},{default:Y(()=>O[11]||(O[11]=[Je(" 前往Firefly III ")])),_:1,__:[11]})):le("",!0),j(s(Qt),{type:"success",onClick:O[3]||(O[3]=F=>T.$router.push("/recent-transactions")),icon:"Document"},{default:Y(()=>O[12]||(O[12]=[Je("查看最近交易")])),_:1,__:[12]}),j(s(Qt),{loading:m.value,type:"primary",onClick:_,disabled:m.value,icon:"Edit"},{default:Y(()=>O[13]||(O[13]=[Je("AI 解析交易记录")])),_:1,__:[13]},8,["loading","disabled"])])]),_:1}),j(yn,{name:"el-fade-in-linear"},{default:Y(()=>[h.value?(b(),ie(s($l),{key:0,class:"firefly-result-card",shadow:"hover",style:{"margin-bottom":"26px"}},{header:Y(()=>[j(s(Ie),null,{default:Y(()=>[j(s(P2))]),_:1}),O[14]||(O[14]=x("span",null,"AI 解析结果",-1))]),default:Y(()=>[C.value?(b(),ie(s(R0),{key:0,title:C.value,type:"info","show-icon":"",closable:!1,style:{"margin-bottom":"20px"}},null,8,["title"])):le("",!0),j(s(yb),{data:y.value,stripe:"",border:"","show-overflow-tooltip":"",style:{"margin-bottom":"18px"}},{default:Y(()=>[j(s(Pr),{prop:"date",label:"日期",width:"110",align:"center"}),j(s(Pr),{prop:"description",label:"描述","min-width":"120",align:"center"}),j(s(Pr),{prop:"amount",label:"金额",width:"100",align:"center"},{default:Y(F=>[j(s(sa),{type:F.row.amount>=0?"success":"danger"},{default:Y(()=>[Je(ke(F.row&&F.row.amount?`${F.row.amount}元`:"-"),1)]),_:2},1032,["type"])]),_:1}),j(s(Pr),{prop:"category",label:"分类",width:"100",align:"center"}),j(s(Pr),{prop:"tags",label:"标签",width:"160",align:"center"},{default:Y(F=>[F.row&&F.row.tags?.length?(b(!0),M(He,{key:0},ht(F.row.tags,W=>(b(),ie(s(sa),{key:W,size:"small",class:"mr-5 firefly-tag"},{default:Y(()=>[Je(ke(W),1)]),_:2},1024))),128)):(b(),M("span",ace,"-"))]),_:1}),j(s(Pr),{prop:"notes",label:"备注","min-width":"100",align:"center"})]),_:1},8,["data"]),x("div",rce,[j(s(Qt),{loading:u.value,type:"success",onClick:w,size:"large",icon:"Check"},{default:Y(()=>O[15]||(O[15]=[Je("确认记录")])),_:1,__:[15]},8,["loading"]),j(s(Qt),{onClick:E,size:"large",icon:"Close"},{default:Y(()=>O[16]||(O[16]=[Je("取消")])),_:1,__:[16]})])]),_:1})):le("",!0)]),_:1}),Qe((b(),ie(s(p_),{modelValue:g.value,"onUpdate:modelValue":O[5]||(O[5]=F=>g.value=F),title:"确认提交",width:"380px","show-close":!0,"close-on-click-modal":!1,"element-loading-text":"提交中...","element-loading-background":"rgba(0, 0, 0, 0.7)"},{footer:Y(()=>[j(s(Qt),{onClick:O[4]||(O[4]=F=>g.value=!1)},{default:Y(()=>O[17]||(O[17]=[Je("取消")])),_:1,__:[17]}),j(s(Qt),{type:"primary",onClick:S},{default:Y(()=>O[18]||(O[18]=[Je("确认")])),_:1,__:[18]})]),default:Y(()=>[j(s(R0),{title:"确定要提交这些交易记录吗？",type:"warning","show-icon":"",effect:"plain",closable:!1,style:{"margin-bottom":"20px"}})]),_:1},8,["modelValue"])),[[P,i.value]])]),_:1})]),_:1})}}},sce=nce(lce,[["__scopeId","data-v-ab76dcdf"]]),ice=xS({history:nS("/static"),mode:"hash",routes:[{path:"/",name:"home",component:sce},{path:"/recent-transactions",name:"recent-transactions",component:()=>RS(()=>import("./RecentTransactionsView-W272H3dX.js"),__vite__mapDeps([0,1]))}]}),cf=q6(MS);cf.use(Eie,{size:"default",zIndex:2e3});for(const[e,t]of Object.entries(iz))cf.component(e,t);cf.use(ice);cf.mount("#app");export{tp as E,He as F,nce as _,j as a,El as b,M as c,sr as d,_t as e,b as f,nc as g,$l as h,x as i,Je as j,yb as k,Pr as l,ht as m,ie as n,at as o,sa as p,B as r,ke as t,s as u,Y as w};
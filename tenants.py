@@ -0,0 +1,279 @@
+import os
+import re
+import json
+import time
+import hashlib
+import asyncio
+import logging
+from typing import Dict, Optional
+from pydantic import ValidationError
+from cache import Cache, global_cache
+from env_settings import Settings, UserConfigs
+from firefly_api import FireflyIIIAPIClient
+from llm_client import FireflyTransactionAgent, ParseBatcher
+from analytics import TransactionSnapshot
+from outbox import Outbox
+
+logger = logging.getLogger("FireflyTenants")
+
+# 租户名只允许字母、数字、下划线和短横线，用于目录名和缓存命名空间
+TENANT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class UnknownTenant(Exception):
+    """请求的租户不存在"""
+
+
+class TenantAuthError(Exception):
+    """多租户模式下请求缺少租户密钥或密钥无效"""
+
+
+def _key_digest(key: str) -> str:
+    # 只保存密钥的摘要，按摘要查表，避免查找耗时泄露密钥内容
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class Tenant:
+    """
+    单个租户的运行时资源：Firefly客户端、缓存、用户配置、统计快照、待发送队列和解析微批处理器
+
+    单用户模式下只有一个默认租户，直接使用全局配置、全局缓存和原有的文件路径。
+    """
+
+    def __init__(self, name: Optional[str], config: Settings, cache: Cache,
+                 user_configs_path: str, outbox_db: str, llm_gate=None):
+        """
+        :param name: 租户名，默认租户为None
+        :param config: 租户配置（Firefly地址/密钥、LLM地址/密钥等）
+        :param cache: 租户独立的缓存
+        :param user_configs_path: 用户配置文件路径
+        :param outbox_db: 待发送队列数据库路径
+        :param llm_gate: 所有租户共享的LLM并发闸门，微批处理时每个批次占用一个名额
+        """
+        self.name = name
+        self.config = config
+        self.cache = cache
+        self.user_configs_path = user_configs_path
+        self.firefly = FireflyIIIAPIClient(
+            base_url=config.firefly_iii_url,
+            api_key=config.firefly_iii_api_key
+        )
+        # 交易列式快照，用于本地汇总统计
+        self.snapshot = TransactionSnapshot(self.firefly)
+        # 本地待发送队列：Firefly不可用或较慢时记账仍可立即返回
+        self.outbox = Outbox(
+            outbox_db,
+            self.firefly,
+            concurrency=config.outbox_concurrency,
+            on_sent=self.snapshot.mark_stale,
+            refresh_hook=self.refresh_validation_lists
+        ) if config.record_outbox else None
+        # 解析请求微批处理（PARSE_BATCH_WINDOW_MS > 0 时开启）
+        self.parse_batcher = ParseBatcher(
+            config.parse_batch_window_ms,
+            config.parse_batch_max_size,
+            agent_factory=self.new_agent,
+            gate=llm_gate
+        ) if config.parse_batch_window_ms > 0 else None
+        self.last_used = time.monotonic()
+
+    @property
+    def user_configs(self) -> UserConfigs:
+        return UserConfigs(self.user_configs_path)
+
+    def new_agent(self) -> FireflyTransactionAgent:
+        return FireflyTransactionAgent(self.config, self.cache, self.firefly)
+
+    def refresh_validation_lists(self):
+        """刷新入队校验用的分类和标签缓存（在 outbox 的工作线程中执行）"""
+        from mcp_server_main import refresh_validation_lists
+        refresh_validation_lists(self.firefly, self.cache)
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def memory_usage(self) -> int:
+        """估算缓存（原始值及序列化结果）和统计快照（列数组及索引字典）占用的字节数"""
+        return self.cache.memory_usage() + self.snapshot.nbytes()
+
+    def trim_memory(self, max_bytes: int) -> bool:
+        """超过内存上限时清空缓存和统计快照，返回是否做了清理"""
+        if max_bytes <= 0 or self.memory_usage() <= max_bytes:
+            return False
+        logger.info(f"租户 {self.name} 内存占用超过上限，清空缓存和统计快照")
+        self.cache.clear()
+        self.snapshot.clear()
+        return True
+
+    def has_pending_work(self) -> bool:
+        """待发送队列中还有交易时不能回收，否则这些交易要等租户再次活跃才会发送"""
+        if self.outbox is None:
+            return False
+        stats = self.outbox.stats()
+        return stats["depth"] > 0 or stats["in_flight"] > 0
+
+    def start(self):
+        if self.outbox is not None:
+            self.outbox.start()
+
+    async def close(self):
+        if self.outbox is not None:
+            await self.outbox.stop()
+            self.outbox.close()
+        UserConfigs.release(self.user_configs_path)
+        if self.name is not None:
+            Cache.drop_namespace(self.name)
+
+
+class TenantRegistry:
+    """
+    租户注册表
+
+    未配置 tenants_file 时为单用户模式，所有请求使用默认租户。
+    配置后每个租户必须设置密钥 key，请求按携带的密钥找到对应租户，缺少或无效的密钥直接拒绝，
+    不会退回默认租户；未在配置中出现的字段沿用全局配置。
+    租户资源按需创建，空闲超过 tenant_idle_seconds 且没有待发送交易时回收。
+    """
+
+    def __init__(self, settings: Settings, llm_gate=None):
+        self.settings = settings
+        self.llm_gate = llm_gate
+        self.tenant_configs: Dict[str, Settings] = {}
+        self._key_to_name: Dict[str, str] = {}
+        self.tenants: Dict[str, Tenant] = {}
+        self.default = Tenant(None, settings, global_cache, "user_configs.json", settings.outbox_db, llm_gate)
+        self._sweeper = None
+        if settings.tenants_file:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.tenants_file)
+
+    def load(self):
+        """读取租户配置文件，每个租户的配置与全局配置合并后完整校验，配置错误在启动时即报出"""
+        with open(self.settings.tenants_file, "r", encoding="utf-8") as f:
+            configs = json.load(f)
+        key_to_name = {}
+        tenant_configs = {}
+        for name, cfg in configs.items():
+            if not TENANT_NAME_PATTERN.match(name):
+                raise ValueError(f"租户名 '{name}' 不合法，只能包含字母、数字、下划线和短横线")
+            cfg = dict(cfg)
+            key = cfg.pop("key", None)
+            if not isinstance(key, str) or len(key) < 16:
+                raise ValueError(f"租户 '{name}' 缺少密钥 key，或密钥短于16个字符")
+            digest = _key_digest(key)
+            if digest in key_to_name:
+                raise ValueError(f"租户 '{name}' 与 '{key_to_name[digest]}' 使用了相同的密钥")
+            key_to_name[digest] = name
+            try:
+                tenant_configs[name] = Settings.model_validate({**self.settings.model_dump(), **cfg})
+            except ValidationError as e:
+                raise ValueError(f"租户 '{name}' 配置错误: {e}") from e
+        self.tenant_configs = tenant_configs
+        self._key_to_name = key_to_name
+
+    def _tenant_dir(self, name: str) -> str:
+        return os.path.join(self.settings.tenant_data_dir, name)
+
+    def _create(self, name: str) -> Tenant:
+        config = self.tenant_configs[name]
+        directory = self._tenant_dir(name)
+        os.makedirs(directory, exist_ok=True)
+        tenant = Tenant(
+            name,
+            config,
+            Cache(namespace=name),
+            os.path.join(directory, "user_configs.json"),
+            os.path.join(directory, "outbox.db"),
+            self.llm_gate
+        )
+        logger.info(f"加载租户 {name}")
+        return tenant
+
+    def authenticate(self, key: Optional[str]) -> Tenant:
+        """
+        按请求携带的租户密钥获取租户
+
+        :param key: 租户密钥，单用户模式下忽略
+        :raises: TenantAuthError 多租户模式下缺少密钥或密钥无效时抛出
+        """
+        if not self.enabled:
+            self.default.touch()
+            return self.default
+        if not key:
+            raise TenantAuthError("缺少租户密钥")
+        name = self._key_to_name.get(_key_digest(key))
+        if name is None:
+            raise TenantAuthError("租户密钥无效")
+        return self.get(name)
+
+    def get(self, name: Optional[str]) -> Tenant:
+        """
+        按租户名获取租户，不存在时按配置创建（仅供内部使用，请求应通过 authenticate 获取）
+
+        :param name: 租户名，单用户模式下返回默认租户
+        :raises: UnknownTenant 当租户不在配置文件中时抛出
+        """
+        if not self.enabled:
+            self.default.touch()
+            return self.default
+        if not name or name not in self.tenant_configs:
+            raise UnknownTenant(f"租户 '{name}' 不存在")
+        tenant = self.tenants.get(name)
+        if tenant is None:
+            tenant = self._create(name)
+            self.tenants[name] = tenant
+            try:
+                tenant.start()
+            except RuntimeError:
+                # 不在事件循环中（例如启动阶段之前），由 start 统一启动
+                pass
+        tenant.touch()
+        return tenant
+
+    def all(self):
+        return [self.default, *self.tenants.values()]
+
+    async def sweep(self):
+        """回收空闲租户，检查各租户内存上限"""
+        max_bytes = self.settings.tenant_max_memory_mb * 1024 * 1024
+        now = time.monotonic()
+        for name, tenant in list(self.tenants.items()):
+            if now - tenant.last_used > self.settings.tenant_idle_seconds and not tenant.has_pending_work():
+                logger.info(f"租户 {name} 空闲，释放资源")
+                self.tenants.pop(name, None)
+                await tenant.close()
+                continue
+            tenant.trim_memory(max_bytes)
+        self.default.trim_memory(max_bytes)
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"回收租户资源失败: {e}")
+
+    def start(self, sweep_interval: float = 60):
+        """启动默认租户（仅单用户模式）、有待发送交易的租户，以及定时回收任务"""
+        if not self.enabled:
+            # 多租户模式下请求不会落到默认租户，不必用全局凭据运行它的发送队列和后台刷新
+            self.default.start()
+        for name in self.tenant_configs:
+            if os.path.exists(os.path.join(self._tenant_dir(name), "outbox.db")):
+                tenant = self.get(name)
+                if not tenant.has_pending_work():
+                    tenant.last_used = 0.0
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop(sweep_interval))
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for tenant in self.all():
+            if tenant.outbox is not None:
+                await tenant.outbox.stop()
@@ -0,0 +1,203 @@
+import sys
+import json
+import time
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# 当前请求的追踪对象，通过 contextvars 在协程、任务和 to_thread 之间传递
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+class Trace:
+    """单个请求的追踪记录，收集各阶段的耗时"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, duration: float, error: Optional[str] = None):
+        span = {
+            "name": name,
+            "offset_ms": round((start - self.start) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if error:
+            span["error"] = error
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def merge(self, other: "Trace"):
+        """把另一个追踪的阶段按实际时间并入本追踪（用于多个请求共享的批处理）"""
+        with other._lock:
+            spans = list(other.spans)
+        for span in spans:
+            self.add(span["name"], other.start + span["offset_ms"] / 1000, span["duration_ms"] / 1000, span.get("error"))
+
+    def summary(self) -> Dict[str, Dict]:
+        """按名称汇总：总耗时和次数（并发的同名阶段耗时会累加）"""
+        result = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            item = result.setdefault(span["name"], {"duration_ms": 0.0, "count": 0})
+            item["duration_ms"] += span["duration_ms"]
+            item["count"] += 1
+        return result
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头"""
+        entries = []
+        for name, item in self.summary().items():
+            entry = f'{name};dur={item["duration_ms"]:.1f}'
+            if item["count"] > 1:
+                entry += f';desc="x{item["count"]}"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed_ms:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "name": self.name,
+            "timestamp": self.wall_start,
+            "total_ms": round(self.elapsed_ms, 3),
+            "spans": spans,
+        }
+
+
+def start_trace(name: str):
+    """开始一个新的请求追踪，返回 (trace, token)，结束时用 token 调用 end_trace"""
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    return trace, token
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str):
+    """
+    记录一个阶段的耗时，没有活动追踪时不做任何事
+
+    名称会直接用作 Server-Timing 的指标名，只使用字母、数字、下划线和点。
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        trace.add(name, start, time.perf_counter() - start, error)
+
+
+def write_trace(filepath: str, trace: Trace, extra: Optional[Dict] = None):
+    """以 JSON Lines 格式追加写入追踪文件"""
+    record = trace.to_dict()
+    if extra:
+        record.update(extra)
+    try:
+        with open(filepath, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"写入追踪文件失败: {e}")
+
+
+class SamplingProfiler:
+    """
+    进程级共享的采样分析器：一个后台线程定时采样所有线程的调用栈
+
+    用于慢请求分析，仅在开启时使用。每个请求通过 begin/end 注册一个采样会话，
+    会话期间的每次采样都会计入该会话；有会话时才运行采样线程。
+    解析和LLM调用运行在 to_thread 工作线程中，因此会采样全部线程，
+    并跳过空闲等待中的线程。同时运行的其他请求也会被采到，结果应视为该时间段内的整体热点。
+    """
+
+    # 栈顶为这些函数的线程视为空闲（事件循环等待IO、线程池等待任务等）
+    IDLE_FUNCTIONS = {"select", "poll", "wait", "_worker", "_wait_for_tstate_lock"}
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 30):
+        """
+        :param interval: 采样间隔（秒）
+        :param max_depth: 每次采样保留的最大栈深度
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self._sessions: List[Counter] = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def begin(self) -> Counter:
+        """注册一个采样会话，返回该会话的采样计数"""
+        session = Counter()
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def end(self, session: Counter):
+        with self._lock:
+            self._sessions = [s for s in self._sessions if s is not session]
+
+    def _sample(self) -> List[str]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own or frame.f_code.co_name in self.IDLE_FUNCTIONS:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                stack.append(names.get(thread_id, str(thread_id)))
+                stacks.append(";".join(reversed(stack)))
+        return stacks
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+            stacks = self._sample()
+            # 在锁内计入仍在注册的会话，end 返回后会话不会再被修改
+            with self._lock:
+                for session in self._sessions:
+                    session.update(stacks)
+
+    @staticmethod
+    def top(session: Counter, limit: int = 20) -> List[Dict]:
+        """返回采样次数最多的调用栈（折叠格式，首项为线程名）"""
+        return [{"stack": stack, "samples": count} for stack, count in session.most_common(limit)]
+
+
+# 全局共享的采样分析器
+profiler = SamplingProfiler()